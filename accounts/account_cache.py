@@ -0,0 +1,98 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class AccountCache:
+    """Bounded in-process LRU cache with a per-entry TTL.
+
+    Safe to share between the gRPC worker threads and Flask request threads.
+    When disabled every lookup is a miss and nothing is stored.
+
+    A reader takes token() before it queries the database and passes it to
+    put(); the put is dropped if the key was invalidated in between, so a
+    slow read cannot bring back a value an update has just replaced.
+    """
+
+    def __init__(self, max_size=10000, ttl=30.0, enabled=True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled and max_size > 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_puts = 0
+        # Invalidation generation per key (bounded like the entries); keys
+        # dropped from it count as invalidated at _floor
+        self._generation = 0
+        self._invalidated = OrderedDict()
+        self._floor = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def token(self):
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value, token=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if token is not None and self._invalidated.get(key, self._floor) > token:
+                self.stale_puts += 1
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > max(self.max_size, 1):
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_puts": self.stale_puts,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
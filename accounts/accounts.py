@@ -3,16 +3,25 @@
 # license that can be found in the LICENSE file.
 
 from concurrent import futures
-import random
+import asyncio
 import datetime
+import json
+import math
 import os
 import grpc
 from accounts_pb2 import *
 import accounts_pb2_grpc
+from indexes import ensure_indexes
+from account_cache import AccountCache
+from account_numbers import AccountNumberAllocator
+from metrics import Counters
+from serving import serve
 import logging
 from dotmap import DotMap
+from pymongo import AsyncMongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from pymongo.mongo_client import MongoClient
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 import requests
 
 # set logging to debug
@@ -37,6 +46,30 @@ if protocol is None:
 protocol = protocol.lower()
 logging.debug(f"microservice protocol: {protocol}")
 
+# gRPC server implementation: "sync" (thread pool) or "aio" (grpc.aio + async MongoDB driver)
+grpc_server_mode = os.getenv("GRPC_SERVER_MODE", "sync").lower()
+logging.debug(f"gRPC server mode: {grpc_server_mode}")
+
+# HTTP server: "development" (Flask dev server) or "production" (gunicorn, see serving.py)
+http_server_mode = os.getenv("HTTP_SERVER_MODE", "development").lower()
+logging.debug(f"HTTP server mode: {http_server_mode}")
+
+# Read-through account cache; set ACCOUNT_CACHE_ENABLED=false for strict-consistency deployments
+account_cache = AccountCache(
+    max_size=int(os.getenv("ACCOUNT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ACCOUNT_CACHE_TTL", "30")),
+    enabled=os.getenv("ACCOUNT_CACHE_ENABLED", "true").lower() == "true",
+)
+logging.debug(f"account cache: {account_cache.stats()}")
+
+# Outcomes of balance adjustments, served on /balance-metrics
+balance_metrics = Counters(
+    "adjustments", "cas_adjustments", "version_conflicts", "insufficient_balance", "not_found"
+)
+
+# Cursor batch size for streamed account listings, overridable per request
+STREAM_BATCH_SIZE = int(os.getenv("ACCOUNTS_STREAM_BATCH_SIZE", "500"))
+
 
 uri = db_url
 
@@ -45,58 +78,242 @@ client = MongoClient(uri)
 db = client["bank"]
 collection = db["accounts"]
 
+# Account numbers come from blocks reserved on bank.counters, one round trip per block
+account_numbers = AccountNumberAllocator(
+    db["counters"], block_size=int(os.getenv("ACCOUNT_NUMBER_BLOCK_SIZE", "1000"))
+)
+
 app = Flask(__name__)
 accounts_generic = None  # Will be initialized later
 
+ACCOUNT_DETAIL_FIELDS = ["account_number", "name", "balance", "currency", "email_id", "account_type", "version"]
+ACCOUNT_DETAIL_PROJECTION = {"_id": 0, **{field: 1 for field in ACCOUNT_DETAIL_FIELDS}}
+
+# Fields of the Account message; documents are projected to exactly these so
+# they can be passed to jsonify or Account(**doc) without further copying
+ACCOUNT_FIELDS = [
+    "account_number",
+    "email_id",
+    "account_type",
+    "address",
+    "govt_id_number",
+    "government_id_type",
+    "name",
+    "balance",
+    "currency",
+]
+ACCOUNT_PROJECTION = {"_id": 0, **{field: 1 for field in ACCOUNT_FIELDS}}
+
+def toAccountDetail(account):
+    return {
+        'account_number': account["account_number"],
+        'name': account["name"],
+        'balance': account["balance"],
+        'currency': account["currency"],
+        'email_id': account["email_id"],
+        'account_type': account["account_type"],
+        # Accounts created before versioning count as version 0
+        'version': account.get("version", 0),
+    }
+
+# Every balance change bumps the account's version. A caller that decided on
+# a balance it read can pass that version as expected_version, turning the
+# change into a compare-and-set; otherwise only the floor guard applies.
+def balanceUpdate(account_number, delta, expected_version=None):
+    query = {"account_number": account_number}
+    if delta < 0:
+        # Floor guard: a debit only matches if it cannot overdraw the account
+        query["balance"] = {"$gte": -delta}
+    if expected_version is not None:
+        query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+    return query, {"$inc": {"balance": delta, "version": 1}}
+
+# Explains, from the current document, why a balance update matched nothing
+def balanceUpdateFailure(current, expected_version):
+    if current is None:
+        balance_metrics.incr("not_found")
+        return {"success": False, "balance": 0, "version": 0, "message": "Account not found."}
+    version = current.get("version", 0)
+    result = {"success": False, "balance": current["balance"], "version": version}
+    if expected_version is not None and version != expected_version:
+        balance_metrics.incr("version_conflicts")
+        return {**result, "message": "Version conflict"}
+    balance_metrics.incr("insufficient_balance")
+    return {**result, "message": "Insufficient Balance"}
+
+# Fields a new account is created from, all required non-empty strings
+NEW_ACCOUNT_FIELDS = (
+    "email_id", "account_type", "address", "govt_id_number", "government_id_type", "name"
+)
+
+def invalidAccountFields(row):
+    # HTTP rows are DotMaps, where a missing field reads as an empty DotMap
+    return [
+        field for field in NEW_ACCOUNT_FIELDS
+        if not isinstance(getattr(row, field, None), str) or not getattr(row, field)
+    ]
+
+def newAccountDocument(request):
+    return {
+        "email_id": request.email_id,
+        "account_type": request.account_type,
+        "address": request.address,
+        "govt_id_number": request.govt_id_number,
+        "government_id_type": request.government_id_type,
+        "name": request.name,
+        "balance": 100,  # Initial balance
+        "version": 0,
+        "currency": "USD",
+        "account_number": account_numbers.next_account_number(),
+        "created_at": datetime.datetime.now()
+    }
+
 class AccountsGeneric:
     def getAccountDetails(self, request):
         logging.debug("Get Account Details called")
-        account = collection.find_one({"account_number": request.account_number})
+        account = account_cache.get(("account", request.account_number))
+        if account is not None:
+            return dict(account)
+
+        token = account_cache.token()
+        account = collection.find_one(
+            {"account_number": request.account_number}, ACCOUNT_DETAIL_PROJECTION
+        )
 
         if account:
-            return {
-                'account_number': account["account_number"],
-                'name': account["name"],
-                'balance': account["balance"],
-                'currency': account["currency"],
-                'email_id': account["email_id"],
-                'account_type': account["account_type"]
-            }
+            account = toAccountDetail(account)
+            account_cache.put(("account", account["account_number"]), account, token)
+            return dict(account)
+
+        return {}
+
+    # Method to get a single account by email_id and optionally account_type
+    def getAccountByEmail(self, request):
+        logging.debug("Get Account By Email called")
+        email_id = request.email_id
+        account_type = getattr(request, 'account_type', None) or None  # Optional
+
+        # The email key only maps to an account number so that balance
+        # invalidation by account number covers both lookups
+        email_key = ("email", email_id, account_type)
+        account_number = account_cache.get(email_key)
+        if account_number is not None:
+            account = account_cache.get(("account", account_number))
+            if account is not None:
+                return dict(account)
+
+        query = {"email_id": email_id}
+        if account_type:
+            query["account_type"] = account_type
+
+        token = account_cache.token()
+        account = collection.find_one(query, ACCOUNT_DETAIL_PROJECTION)
+        if account:
+            account = toAccountDetail(account)
+            account_cache.put(("account", account["account_number"]), account, token)
+            account_cache.put(email_key, account["account_number"], token)
+            return dict(account)
 
         return {}
 
+    # Method to resolve many account numbers with a single $in query.
+    # Returns a dict keyed by account number; missing accounts map to None.
+    # Transfers decide on these balances and versions, so the cache (which
+    # other replicas do not invalidate) is bypassed.
+    def getAccountDetailsBatch(self, request):
+        logging.debug("Get Account Details Batch called")
+        account_numbers = list(dict.fromkeys(request.account_numbers or []))
+        results = dict.fromkeys(account_numbers)
+        if not account_numbers:
+            return results
+
+        accounts = collection.find(
+            {"account_number": {"$in": account_numbers}}, ACCOUNT_DETAIL_PROJECTION
+        )
+        for account in accounts:
+            results[account["account_number"]] = toAccountDetail(account)
+
+        return results
+
     # Method to create a new account
     def createAccount(self, request):
         logging.debug("Create Account called")
-        # Check if the account with email and account type already exists
-        count = collection.count_documents(
-            {"email_id": request.email_id, "account_type": request.account_type}
-        )
+        account = newAccountDocument(request)
 
-        logging.debug(f"Count: {count}")
-
-        if count > 0:
+        # Insert the account into the database; the (email_id, account_type)
+        # unique index rejects an account that already exists
+        try:
+            collection.insert_one(account)
+        except DuplicateKeyError:
             logging.debug("Account already exists")
             return False  # Account creation failed
 
-        account = {
-            "email_id": request.email_id,
-            "account_type": request.account_type,
-            "address": request.address,
-            "govt_id_number": request.govt_id_number,
-            "government_id_type": request.government_id_type,
-            "name": request.name,
-            "balance": 100,  # Initial balance
-            "currency": "USD",
-            "account_number": f"IBAN{random.randint(1000000000000000, 9999999999999999)}",
-            "created_at": datetime.datetime.now()
-        }
-
-        # Insert the account into the database
-        collection.insert_one(account)
+        account_cache.invalidate(("email", request.email_id, request.account_type))
+        account_cache.invalidate(("email", request.email_id, None))
         logging.debug(f"Account created with account_number: {account['account_number']}")
         return True  # Account creation successful
 
+    # Method to create many accounts with one unordered insert_many. The
+    # (email_id, account_type) unique index does the duplicate check, so one
+    # bad row never blocks the rest. Returns one result per input row.
+    def createAccountsBatch(self, request):
+        logging.debug("Create Accounts Batch called")
+        results = []
+        documents = []
+        row_indexes = []  # position in documents -> position in the request
+        seen = set()
+
+        for index, row in enumerate(request.accounts or []):
+            result = {"index": index, "success": False, "account_number": "", "message": ""}
+            results.append(result)
+
+            invalid = invalidAccountFields(row)
+            if invalid:
+                result["message"] = f"Missing or invalid fields: {', '.join(invalid)}."
+                continue
+
+            key = (row.email_id, row.account_type)
+            if key in seen:
+                result["message"] = "Duplicate account in batch."
+                continue
+            seen.add(key)
+
+            account = newAccountDocument(row)
+            result["account_number"] = account["account_number"]
+            documents.append(account)
+            row_indexes.append(index)
+
+        if not documents:
+            return results
+
+        write_errors = []
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+
+        failed = {}
+        for error in write_errors:
+            if error.get("code") == 11000:
+                failed[error["index"]] = "Account already exists."
+            else:
+                failed[error["index"]] = error.get("errmsg", "Insert failed.")
+
+        for position, index in enumerate(row_indexes):
+            result = results[index]
+            if position in failed:
+                result["account_number"] = ""
+                result["message"] = failed[position]
+            else:
+                result["success"] = True
+                result["message"] = "Account created."
+                row = request.accounts[index]
+                account_cache.invalidate(("email", row.email_id, row.account_type))
+                account_cache.invalidate(("email", row.email_id, None))
+
+        logging.debug(f"Created {len(documents) - len(failed)} of {len(results)} accounts")
+        return results
+
     # Method to get accounts based on email_id and optionally account_number
     def getAccounts(self, request):
         email_id = request.email_id
@@ -107,27 +324,21 @@ class AccountsGeneric:
         if account_number:
             query["account_number"] = account_number
 
-        accounts = collection.find(query)
-        account_list = []
-        for account in accounts:
-            acc = {
-                k: v
-                for k, v in account.items()
-                if k in [
-                    "account_number",
-                    "email_id",
-                    "account_type",
-                    "address",
-                    "govt_id_number",
-                    "government_id_type",
-                    "name",
-                    "balance",
-                    "currency",
-                ]
-            }
-            account_list.append(acc)
+        return list(collection.find(query, ACCOUNT_PROJECTION))
+
+    # Generator over accounts by email_id and optionally account_type, fed by
+    # the Mongo cursor batch by batch. Closing the generator closes the cursor.
+    def iterAccounts(self, request):
+        logging.debug("Iterate Accounts called")
+        account_type = getattr(request, 'account_type', None)  # Optional
+        batch_size = getattr(request, 'batch_size', None) or STREAM_BATCH_SIZE
+
+        query = {"email_id": request.email_id}
+        if account_type:
+            query["account_type"] = account_type
 
-        return account_list
+        with collection.find(query, ACCOUNT_PROJECTION, batch_size=int(batch_size)) as cursor:
+            yield from cursor
 
     def updateBalance(self, request):
         logging.debug("Update Balance called")
@@ -140,8 +351,9 @@ class AccountsGeneric:
 
         result = collection.update_one(
             {"account_number": account_number},
-            {"$set": {"balance": new_balance}}
+            {"$set": {"balance": new_balance}, "$inc": {"version": 1}}
         )
+        account_cache.invalidate(("account", account_number))
 
         if result.matched_count == 0:
             logging.debug("Account not found")
@@ -150,6 +362,77 @@ class AccountsGeneric:
         logging.debug(f"Account {account_number} balance updated to {new_balance}")
         return True  # Update successful
 
+    # Method to apply a signed balance delta in a single atomic update,
+    # optionally conditioned on the account version (compare-and-set)
+    def adjustBalance(self, request):
+        logging.debug("Adjust Balance called")
+        account_number = request.account_number
+        delta = float(request.delta)
+        expected_version = getattr(request, 'expected_version', None)  # Optional
+
+        query, update = balanceUpdate(account_number, delta, expected_version)
+        balance_metrics.incr("cas_adjustments" if expected_version is not None else "adjustments")
+        account = collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 0, "balance": 1, "version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        account_cache.invalidate(("account", account_number))
+
+        if account is None:
+            # Only the failure path pays for a second lookup
+            current = collection.find_one(
+                {"account_number": account_number}, {"_id": 0, "balance": 1, "version": 1}
+            )
+            result = balanceUpdateFailure(current, expected_version)
+            logging.debug(f"Balance adjustment on {account_number} failed: {result['message']}")
+            return result
+
+        logging.debug(f"Account {account_number} balance adjusted by {delta} to {account['balance']}")
+        return {
+            "success": True,
+            "balance": account["balance"],
+            "version": account["version"],
+            "message": "Balance adjusted successfully.",
+        }
+
+    # Credits many accounts with one unordered bulk write. Amounts for the
+    # same account are summed. Returns {account_number: credited}; an account
+    # is only reported as not credited if it does not exist.
+    def creditAccountsBatch(self, request):
+        logging.debug("Credit Accounts Batch called")
+        totals = {}
+        for credit in request.credits or []:
+            totals[credit.account_number] = totals.get(credit.account_number, 0) + float(credit.amount)
+        if not totals:
+            return {}
+
+        result = collection.bulk_write(
+            [
+                UpdateOne({"account_number": account_number}, {"$inc": {"balance": amount, "version": 1}})
+                for account_number, amount in totals.items()
+            ],
+            ordered=False,
+        )
+        for account_number in totals:
+            account_cache.invalidate(("account", account_number))
+
+        credited = dict.fromkeys(totals, True)
+        if result.matched_count < len(totals):
+            # Only the failure path pays for a second lookup
+            existing = {
+                account["account_number"]
+                for account in collection.find(
+                    {"account_number": {"$in": list(totals)}}, {"_id": 0, "account_number": 1}
+                )
+            }
+            for account_number in totals:
+                credited[account_number] = account_number in existing
+
+        logging.debug(f"Credited {sum(credited.values())} of {len(totals)} accounts")
+        return credited
+
 class AccountDetailsService(accounts_pb2_grpc.AccountDetailsServiceServicer):
     def __init__(self):
         self.accounts = AccountsGeneric()
@@ -165,40 +448,287 @@ class AccountDetailsService(accounts_pb2_grpc.AccountDetailsServiceServicer):
                 balance=account["balance"],
                 currency=account["currency"],
                 email_id=account["email_id"],
-                account_type=account["account_type"]
+                account_type=account["account_type"],
+                version=account["version"],
             )
         return AccountDetail()
 
+    def GetAccountByEmail(self, request, context):
+        logging.debug("gRPC Get Account By Email called")
+        account = self.accounts.getAccountByEmail(request)
+        if account:
+            return GetAccountByEmailResponse(found=True, **account)
+        return GetAccountByEmailResponse(found=False)
+
+    def getAccountDetailsBatch(self, request, context):
+        logging.debug("gRPC Get Account Details Batch called")
+        accounts = self.accounts.getAccountDetailsBatch(request)
+        response = GetAccountDetailsBatchResponse()
+        for account_number, account in accounts.items():
+            result = response.accounts[account_number]
+            result.found = account is not None
+            if account is not None:
+                result.account.CopyFrom(AccountDetail(**account))
+        return response
+
     def createAccount(self, request, context):
         logging.debug("gRPC Create Account called")
         result = self.accounts.createAccount(request)
         return CreateAccountResponse(result=result)
 
+    def createAccountsBatch(self, request, context):
+        logging.debug("gRPC Create Accounts Batch called")
+        results = self.accounts.createAccountsBatch(request)
+        return CreateAccountsBatchResponse(
+            results=[CreateAccountResult(**result) for result in results]
+        )
+
     def getAccounts(self, request, context):
         logging.debug("gRPC Get Accounts called")
         accounts = self.accounts.getAccounts(request)
-        account_list = []
-        for account in accounts:
-            account_list.append(
-                Account(
-                    account_number=account["account_number"],
-                    email_id=account["email_id"],
-                    account_type=account["account_type"],
-                    address=account["address"],
-                    govt_id_number=account["govt_id_number"],
-                    government_id_type=account["government_id_type"],
-                    name=account["name"],
-                    balance=account["balance"],
-                    currency=account["currency"],
-                )
-            )
-        return GetAccountsResponse(accounts=account_list)
+        return GetAccountsResponse(accounts=[Account(**account) for account in accounts])
+
+    def streamAccounts(self, request, context):
+        logging.debug("gRPC Stream Accounts called")
+        if request.batch_size < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid batch_size value.")
+        accounts = self.accounts.iterAccounts(request)
+        try:
+            for account in accounts:
+                if not context.is_active():
+                    logging.debug("Stream Accounts cancelled by client")
+                    break
+                yield Account(**account)
+        finally:
+            accounts.close()
 
     def updateBalance(self, request, context):
         logging.debug("gRPC Update Balance called")
         success = self.accounts.updateBalance(request)
         return UpdateBalanceResponse(success=success)
 
+    def adjustBalance(self, request, context):
+        logging.debug("gRPC Adjust Balance called")
+        if not math.isfinite(request.delta):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid delta value.")
+        result = self.accounts.adjustBalance(DotMap(
+            account_number=request.account_number,
+            delta=request.delta,
+            expected_version=request.expected_version if request.HasField("expected_version") else None,
+        ))
+        return AdjustBalanceResponse(**result)
+
+    def creditAccountsBatch(self, request, context):
+        logging.debug("gRPC Credit Accounts Batch called")
+        if any(not math.isfinite(credit.amount) or credit.amount <= 0 for credit in request.credits):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Credit amounts must be positive.")
+        credited = self.accounts.creditAccountsBatch(request)
+        return CreditAccountsBatchResponse(credited=credited)
+
+# asyncio counterpart of AccountsGeneric for the grpc.aio server. Reads and
+# balance deltas go through the async MongoDB driver; account creation and
+# absolute balance updates run the sync AccountsGeneric in a worker thread so
+# the allocator and duplicate handling live in one place.
+class AsyncAccountsGeneric:
+    def __init__(self, async_collection):
+        self.collection = async_collection
+
+    async def getAccountDetails(self, request):
+        logging.debug("Async Get Account Details called")
+        account = account_cache.get(("account", request.account_number))
+        if account is not None:
+            return dict(account)
+
+        token = account_cache.token()
+        account = await self.collection.find_one(
+            {"account_number": request.account_number}, ACCOUNT_DETAIL_PROJECTION
+        )
+
+        if account:
+            account = toAccountDetail(account)
+            account_cache.put(("account", account["account_number"]), account, token)
+            return dict(account)
+
+        return {}
+
+    async def getAccountByEmail(self, request):
+        logging.debug("Async Get Account By Email called")
+        account_type = request.account_type or None  # Optional
+
+        email_key = ("email", request.email_id, account_type)
+        account_number = account_cache.get(email_key)
+        if account_number is not None:
+            account = account_cache.get(("account", account_number))
+            if account is not None:
+                return dict(account)
+
+        query = {"email_id": request.email_id}
+        if account_type:
+            query["account_type"] = account_type
+
+        token = account_cache.token()
+        account = await self.collection.find_one(query, ACCOUNT_DETAIL_PROJECTION)
+        if account:
+            account = toAccountDetail(account)
+            account_cache.put(("account", account["account_number"]), account, token)
+            account_cache.put(email_key, account["account_number"], token)
+            return dict(account)
+
+        return {}
+
+    async def getAccountDetailsBatch(self, request):
+        logging.debug("Async Get Account Details Batch called")
+        account_numbers = list(dict.fromkeys(request.account_numbers))
+        results = dict.fromkeys(account_numbers)
+        if not account_numbers:
+            return results
+
+        async for account in self.collection.find(
+            {"account_number": {"$in": account_numbers}}, ACCOUNT_DETAIL_PROJECTION
+        ):
+            results[account["account_number"]] = toAccountDetail(account)
+
+        return results
+
+    async def getAccounts(self, request):
+        query = {"email_id": request.email_id}
+        if request.account_number:
+            query["account_number"] = request.account_number
+
+        return await self.collection.find(query, ACCOUNT_PROJECTION).to_list(None)
+
+    async def iterAccounts(self, request):
+        logging.debug("Async Iterate Accounts called")
+        batch_size = request.batch_size or STREAM_BATCH_SIZE
+
+        query = {"email_id": request.email_id}
+        if request.account_type:
+            query["account_type"] = request.account_type
+
+        cursor = self.collection.find(query, ACCOUNT_PROJECTION, batch_size=batch_size)
+        try:
+            async for account in cursor:
+                yield account
+        finally:
+            await cursor.close()
+
+    async def adjustBalance(self, request):
+        logging.debug("Async Adjust Balance called")
+        account_number = request.account_number
+        delta = float(request.delta)
+        expected_version = request.expected_version if request.HasField("expected_version") else None
+
+        query, update = balanceUpdate(account_number, delta, expected_version)
+        balance_metrics.incr("cas_adjustments" if expected_version is not None else "adjustments")
+        account = await self.collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 0, "balance": 1, "version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        account_cache.invalidate(("account", account_number))
+
+        if account is None:
+            current = await self.collection.find_one(
+                {"account_number": account_number}, {"_id": 0, "balance": 1, "version": 1}
+            )
+            return balanceUpdateFailure(current, expected_version)
+
+        return {
+            "success": True,
+            "balance": account["balance"],
+            "version": account["version"],
+            "message": "Balance adjusted successfully.",
+        }
+
+    async def createAccount(self, request):
+        return await asyncio.to_thread(accounts_generic.createAccount, request)
+
+    async def createAccountsBatch(self, request):
+        return await asyncio.to_thread(accounts_generic.createAccountsBatch, request)
+
+    async def updateBalance(self, request):
+        return await asyncio.to_thread(accounts_generic.updateBalance, request)
+
+    async def creditAccountsBatch(self, request):
+        return await asyncio.to_thread(accounts_generic.creditAccountsBatch, request)
+
+class AsyncAccountDetailsService(accounts_pb2_grpc.AccountDetailsServiceServicer):
+    def __init__(self, async_collection):
+        self.accounts = AsyncAccountsGeneric(async_collection)
+
+    async def getAccountDetails(self, request, context):
+        logging.debug("gRPC aio Get Account Details called")
+        account = await self.accounts.getAccountDetails(request)
+        return AccountDetail(**account)
+
+    async def GetAccountByEmail(self, request, context):
+        logging.debug("gRPC aio Get Account By Email called")
+        account = await self.accounts.getAccountByEmail(request)
+        if account:
+            return GetAccountByEmailResponse(found=True, **account)
+        return GetAccountByEmailResponse(found=False)
+
+    async def getAccountDetailsBatch(self, request, context):
+        logging.debug("gRPC aio Get Account Details Batch called")
+        accounts = await self.accounts.getAccountDetailsBatch(request)
+        response = GetAccountDetailsBatchResponse()
+        for account_number, account in accounts.items():
+            result = response.accounts[account_number]
+            result.found = account is not None
+            if account is not None:
+                result.account.CopyFrom(AccountDetail(**account))
+        return response
+
+    async def createAccount(self, request, context):
+        logging.debug("gRPC aio Create Account called")
+        result = await self.accounts.createAccount(request)
+        return CreateAccountResponse(result=result)
+
+    async def createAccountsBatch(self, request, context):
+        logging.debug("gRPC aio Create Accounts Batch called")
+        results = await self.accounts.createAccountsBatch(request)
+        return CreateAccountsBatchResponse(
+            results=[CreateAccountResult(**result) for result in results]
+        )
+
+    async def getAccounts(self, request, context):
+        logging.debug("gRPC aio Get Accounts called")
+        accounts = await self.accounts.getAccounts(request)
+        return GetAccountsResponse(accounts=[Account(**account) for account in accounts])
+
+    async def streamAccounts(self, request, context):
+        logging.debug("gRPC aio Stream Accounts called")
+        if request.batch_size < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid batch_size value.")
+        # Client cancellation raises CancelledError at the next await, and
+        # aclose() then closes the cursor
+        accounts = self.accounts.iterAccounts(request)
+        try:
+            async for account in accounts:
+                yield Account(**account)
+        finally:
+            await accounts.aclose()
+
+    async def updateBalance(self, request, context):
+        logging.debug("gRPC aio Update Balance called")
+        success = await self.accounts.updateBalance(request)
+        return UpdateBalanceResponse(success=success)
+
+    async def adjustBalance(self, request, context):
+        logging.debug("gRPC aio Adjust Balance called")
+        if not math.isfinite(request.delta):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid delta value.")
+        result = await self.accounts.adjustBalance(request)
+        return AdjustBalanceResponse(**result)
+
+    async def creditAccountsBatch(self, request, context):
+        logging.debug("gRPC aio Credit Accounts Batch called")
+        if any(not math.isfinite(credit.amount) or credit.amount <= 0 for credit in request.credits):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Credit amounts must be positive.")
+        credited = await self.accounts.creditAccountsBatch(request)
+        return CreditAccountsBatchResponse(credited=credited)
+
 accounts_generic = AccountsGeneric()
 
 # Flask Routes
@@ -209,6 +739,16 @@ def getAccountDetails():
     account = accounts_generic.getAccountDetails(data)
     return jsonify(account)
 
+@app.route("/account-detail-batch", methods=["POST"])
+def getAccountDetailsBatch():
+    data = request.json
+    data = DotMap(data)
+    accounts = accounts_generic.getAccountDetailsBatch(data)
+    return jsonify({
+        account_number: {"found": account is not None, "account": account or {}}
+        for account_number, account in accounts.items()
+    })
+
 @app.route("/create-account", methods=["POST"])
 def createAccount():
     data = request.json
@@ -216,6 +756,13 @@ def createAccount():
     result = accounts_generic.createAccount(data)
     return jsonify({"success": result})
 
+@app.route("/create-accounts-batch", methods=["POST"])
+def createAccountsBatch():
+    data = request.json
+    data = DotMap(data)
+    results = accounts_generic.createAccountsBatch(data)
+    return jsonify({"results": results})
+
 @app.route("/get-all-accounts", methods=["POST"])
 def getAccounts():
     data = request.json
@@ -223,31 +770,50 @@ def getAccounts():
     accounts = accounts_generic.getAccounts(data)
     return jsonify(accounts)
 
+# Streams accounts as NDJSON; the WSGI server closes the generator (and the
+# cursor) when the client disconnects
+@app.route("/stream-accounts", methods=["POST"])
+def streamAccounts():
+    data = request.json
+    data = DotMap(data)
+
+    # Input validation; iterAccounts is lazy, so a bad batch_size would
+    # otherwise fail after the response has started
+    if "batch_size" in data and data.batch_size is not None and (
+        not isinstance(data.batch_size, int) or isinstance(data.batch_size, bool) or data.batch_size < 0
+    ):
+        logging.debug("Invalid batch_size value received")
+        return jsonify({"message": "Invalid batch_size value."}), 400
+    accounts = accounts_generic.iterAccounts(data)
+
+    def generate():
+        try:
+            for account in accounts:
+                yield json.dumps(account) + "\n"
+        finally:
+            accounts.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route("/get-account-by-email", methods=["POST"])
 def getAccountByEmail():
     logging.debug("Get Account By Email API called")
     data = request.json
     data = DotMap(data)
-    email_id = data.email_id
-    account_type = getattr(data, 'account_type', None)  # Optional
-
-    query = {"email_id": email_id}
-    if account_type:
-        query["account_type"] = account_type
-
-    account = collection.find_one(query)
+    account = accounts_generic.getAccountByEmail(data)
     if account:
-        return jsonify({
-            'account_number': account["account_number"],
-            'name': account["name"],
-            'balance': account["balance"],
-            'currency': account["currency"],
-            'email_id': account["email_id"],
-            'account_type': account["account_type"]
-        })
+        return jsonify(account)
     return jsonify({}), 404
 
-# Note: this route is used only by loan service to update the balance
+@app.route("/balance-metrics", methods=["GET"])
+def getBalanceMetrics():
+    return jsonify(balance_metrics.snapshot())
+
+@app.route("/account-cache/stats", methods=["GET"])
+def getAccountCacheStats():
+    return jsonify(account_cache.stats())
+
+# Note: kept for compatibility, transactions and loan use /adjust-balance
 @app.route("/update-balance", methods=["POST"])
 def updateBalance():
     data = request.json
@@ -274,9 +840,53 @@ def updateBalance():
     else:
         return jsonify({"success": False, "message": "Account not found or invalid balance."}), 404
 
+@app.route("/adjust-balance", methods=["POST"])
+def adjustBalance():
+    data = request.json
+    data = DotMap(data)
+
+    # Input validation
+    # NaN would slip past the floor guard, since NaN < 0 is False
+    if not isinstance(data.delta, (int, float)) or isinstance(data.delta, bool) or not math.isfinite(data.delta):
+        logging.debug("Invalid delta value received")
+        return jsonify({"success": False, "balance": 0, "message": "Invalid delta value."}), 400
+    expected_version = data.expected_version if "expected_version" in data else None
+    if expected_version is not None and (not isinstance(expected_version, int) or isinstance(expected_version, bool)):
+        logging.debug("Invalid expected_version value received")
+        return jsonify({"success": False, "balance": 0, "message": "Invalid expected_version value."}), 400
+    data.expected_version = expected_version
+
+    result = accounts_generic.adjustBalance(data)
+
+    if result["success"]:
+        return jsonify(result)
+    elif result["message"] in ("Insufficient Balance", "Version conflict"):
+        return jsonify(result), 409
+    else:
+        return jsonify(result), 404
+
+@app.route("/credit-accounts-batch", methods=["POST"])
+def creditAccountsBatch():
+    data = request.json
+    data = DotMap(data)
+
+    # Input validation
+    for credit in data.credits or []:
+        if not isinstance(credit.amount, (int, float)) or isinstance(credit.amount, bool) \
+                or not math.isfinite(credit.amount) or credit.amount <= 0:
+            logging.debug("Invalid credit amount received")
+            return jsonify({"message": "Credit amounts must be positive numbers."}), 400
+
+    credited = accounts_generic.creditAccountsBatch(data)
+    return jsonify({"credited": credited})
+
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
+    if http_server_mode == "production":
+        logging.debug(f"Starting production HTTP server on port {port}")
+        serve(app, port)
+    else:
+        logging.debug(f"Starting Flask server on port {port}")
+        app.run(host='0.0.0.0', port=port, debug=True)
 
 def serverGRPC(port):
     # recommendations_host = os.getenv("RECOMMENDATIONS_HOST", "localhost")
@@ -293,10 +903,25 @@ def serverGRPC(port):
     server.start()
     server.wait_for_termination()
 
+async def serverGRPCAio(port):
+    logging.debug(f"Starting gRPC asyncio server on port {port}")
+    async_collection = AsyncMongoClient(uri)["bank"]["accounts"]
+    server = grpc.aio.server()
+    accounts_pb2_grpc.add_AccountDetailsServiceServicer_to_server(
+        AsyncAccountDetailsService(async_collection), server
+    )
+    server.add_insecure_port(f"[::]:{port}")
+    logging.debug(f"Server started at port {port}")
+    await server.start()
+    await server.wait_for_termination()
+
 if __name__ == "__main__":
     port = 50051
+    ensure_indexes(db)
     # serverGRPC(port)
-    if protocol == "grpc":
+    if protocol == "grpc" and grpc_server_mode == "aio":
+        asyncio.run(serverGRPCAio(port))
+    elif protocol == "grpc":
         serverGRPC(port)
     else:
         serverFlask(port)
@@ -5,16 +5,32 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
+import warnings
 
 import accounts_pb2 as accounts__pb2
 
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in accounts_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
 
-class AccountDetailsServiceStub(object):
-    """message GetAccountDetailResponse {
-    AccountDetail account = 1;
-    }
 
-    """
+class AccountDetailsServiceStub:
+    """Missing associated documentation comment in .proto file."""
 
     def __init__(self, channel):
         """Constructor.
@@ -26,25 +42,56 @@ class AccountDetailsServiceStub(object):
                 '/AccountDetailsService/getAccountDetails',
                 request_serializer=accounts__pb2.GetAccountDetailRequest.SerializeToString,
                 response_deserializer=accounts__pb2.AccountDetail.FromString,
-                )
+                _registered_method=True)
         self.createAccount = channel.unary_unary(
                 '/AccountDetailsService/createAccount',
                 request_serializer=accounts__pb2.CreateAccountRequest.SerializeToString,
                 response_deserializer=accounts__pb2.CreateAccountResponse.FromString,
-                )
+                _registered_method=True)
         self.getAccounts = channel.unary_unary(
                 '/AccountDetailsService/getAccounts',
                 request_serializer=accounts__pb2.GetAccountsRequest.SerializeToString,
                 response_deserializer=accounts__pb2.GetAccountsResponse.FromString,
-                )
+                _registered_method=True)
+        self.updateBalance = channel.unary_unary(
+                '/AccountDetailsService/updateBalance',
+                request_serializer=accounts__pb2.UpdateBalanceRequest.SerializeToString,
+                response_deserializer=accounts__pb2.UpdateBalanceResponse.FromString,
+                _registered_method=True)
+        self.GetAccountByEmail = channel.unary_unary(
+                '/AccountDetailsService/GetAccountByEmail',
+                request_serializer=accounts__pb2.GetAccountByEmailRequest.SerializeToString,
+                response_deserializer=accounts__pb2.GetAccountByEmailResponse.FromString,
+                _registered_method=True)
+        self.adjustBalance = channel.unary_unary(
+                '/AccountDetailsService/adjustBalance',
+                request_serializer=accounts__pb2.AdjustBalanceRequest.SerializeToString,
+                response_deserializer=accounts__pb2.AdjustBalanceResponse.FromString,
+                _registered_method=True)
+        self.getAccountDetailsBatch = channel.unary_unary(
+                '/AccountDetailsService/getAccountDetailsBatch',
+                request_serializer=accounts__pb2.GetAccountDetailsBatchRequest.SerializeToString,
+                response_deserializer=accounts__pb2.GetAccountDetailsBatchResponse.FromString,
+                _registered_method=True)
+        self.streamAccounts = channel.unary_stream(
+                '/AccountDetailsService/streamAccounts',
+                request_serializer=accounts__pb2.StreamAccountsRequest.SerializeToString,
+                response_deserializer=accounts__pb2.Account.FromString,
+                _registered_method=True)
+        self.createAccountsBatch = channel.unary_unary(
+                '/AccountDetailsService/createAccountsBatch',
+                request_serializer=accounts__pb2.CreateAccountsBatchRequest.SerializeToString,
+                response_deserializer=accounts__pb2.CreateAccountsBatchResponse.FromString,
+                _registered_method=True)
+        self.creditAccountsBatch = channel.unary_unary(
+                '/AccountDetailsService/creditAccountsBatch',
+                request_serializer=accounts__pb2.CreditAccountsBatchRequest.SerializeToString,
+                response_deserializer=accounts__pb2.CreditAccountsBatchResponse.FromString,
+                _registered_method=True)
 
 
-class AccountDetailsServiceServicer(object):
-    """message GetAccountDetailResponse {
-    AccountDetail account = 1;
-    }
-
-    """
+class AccountDetailsServiceServicer:
+    """Missing associated documentation comment in .proto file."""
 
     def getAccountDetails(self, request, context):
         """Missing associated documentation comment in .proto file."""
@@ -64,6 +111,48 @@ class AccountDetailsServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def updateBalance(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetAccountByEmail(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def adjustBalance(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getAccountDetailsBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def streamAccounts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def createAccountsBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def creditAccountsBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_AccountDetailsServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -82,19 +171,51 @@ def add_AccountDetailsServiceServicer_to_server(servicer, server):
                     request_deserializer=accounts__pb2.GetAccountsRequest.FromString,
                     response_serializer=accounts__pb2.GetAccountsResponse.SerializeToString,
             ),
+            'updateBalance': grpc.unary_unary_rpc_method_handler(
+                    servicer.updateBalance,
+                    request_deserializer=accounts__pb2.UpdateBalanceRequest.FromString,
+                    response_serializer=accounts__pb2.UpdateBalanceResponse.SerializeToString,
+            ),
+            'GetAccountByEmail': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetAccountByEmail,
+                    request_deserializer=accounts__pb2.GetAccountByEmailRequest.FromString,
+                    response_serializer=accounts__pb2.GetAccountByEmailResponse.SerializeToString,
+            ),
+            'adjustBalance': grpc.unary_unary_rpc_method_handler(
+                    servicer.adjustBalance,
+                    request_deserializer=accounts__pb2.AdjustBalanceRequest.FromString,
+                    response_serializer=accounts__pb2.AdjustBalanceResponse.SerializeToString,
+            ),
+            'getAccountDetailsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.getAccountDetailsBatch,
+                    request_deserializer=accounts__pb2.GetAccountDetailsBatchRequest.FromString,
+                    response_serializer=accounts__pb2.GetAccountDetailsBatchResponse.SerializeToString,
+            ),
+            'streamAccounts': grpc.unary_stream_rpc_method_handler(
+                    servicer.streamAccounts,
+                    request_deserializer=accounts__pb2.StreamAccountsRequest.FromString,
+                    response_serializer=accounts__pb2.Account.SerializeToString,
+            ),
+            'createAccountsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.createAccountsBatch,
+                    request_deserializer=accounts__pb2.CreateAccountsBatchRequest.FromString,
+                    response_serializer=accounts__pb2.CreateAccountsBatchResponse.SerializeToString,
+            ),
+            'creditAccountsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.creditAccountsBatch,
+                    request_deserializer=accounts__pb2.CreditAccountsBatchRequest.FromString,
+                    response_serializer=accounts__pb2.CreditAccountsBatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'AccountDetailsService', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('AccountDetailsService', rpc_method_handlers)
 
 
  # This class is part of an EXPERIMENTAL API.
-class AccountDetailsService(object):
-    """message GetAccountDetailResponse {
-    AccountDetail account = 1;
-    }
-
-    """
+class AccountDetailsService:
+    """Missing associated documentation comment in .proto file."""
 
     @staticmethod
     def getAccountDetails(request,
@@ -107,11 +228,21 @@ class AccountDetailsService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/AccountDetailsService/getAccountDetails',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccountDetails',
             accounts__pb2.GetAccountDetailRequest.SerializeToString,
             accounts__pb2.AccountDetail.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def createAccount(request,
@@ -124,11 +255,21 @@ class AccountDetailsService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/AccountDetailsService/createAccount',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/createAccount',
             accounts__pb2.CreateAccountRequest.SerializeToString,
             accounts__pb2.CreateAccountResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def getAccounts(request,
@@ -141,8 +282,207 @@ class AccountDetailsService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/AccountDetailsService/getAccounts',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccounts',
             accounts__pb2.GetAccountsRequest.SerializeToString,
             accounts__pb2.GetAccountsResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def updateBalance(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/updateBalance',
+            accounts__pb2.UpdateBalanceRequest.SerializeToString,
+            accounts__pb2.UpdateBalanceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetAccountByEmail(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/GetAccountByEmail',
+            accounts__pb2.GetAccountByEmailRequest.SerializeToString,
+            accounts__pb2.GetAccountByEmailResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def adjustBalance(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/adjustBalance',
+            accounts__pb2.AdjustBalanceRequest.SerializeToString,
+            accounts__pb2.AdjustBalanceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getAccountDetailsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccountDetailsBatch',
+            accounts__pb2.GetAccountDetailsBatchRequest.SerializeToString,
+            accounts__pb2.GetAccountDetailsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def streamAccounts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/AccountDetailsService/streamAccounts',
+            accounts__pb2.StreamAccountsRequest.SerializeToString,
+            accounts__pb2.Account.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def createAccountsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/createAccountsBatch',
+            accounts__pb2.CreateAccountsBatchRequest.SerializeToString,
+            accounts__pb2.CreateAccountsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def creditAccountsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/creditAccountsBatch',
+            accounts__pb2.CreditAccountsBatchRequest.SerializeToString,
+            accounts__pb2.CreditAccountsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,338 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Benchmarks for the accounts service.
+
+Service benchmarks run against a live accounts service and its MongoDB;
+microbenchmarks run offline. Start the services for batch and grpc-modes
+with ACCOUNT_CACHE_ENABLED=false: otherwise getAccountDetails is answered
+from the in-process account cache and the MongoDB path is not measured
+(getAccountDetailsBatch always reads MongoDB).
+
+    python benchmark.py batch --size 50 --rounds 20 --protocol grpc
+    python benchmark.py projection --accounts 5000
+    python benchmark.py bulk-create --accounts 2000 --chunk 1000
+    python benchmark.py grpc-modes --target sync=localhost:50051 --target aio=localhost:50061
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import time
+import uuid
+
+import bson
+import grpc
+import requests
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from pymongo.mongo_client import MongoClient
+
+from accounts_pb2 import *
+import accounts_pb2_grpc
+
+load_dotenv()
+
+ACCOUNTS_SERVICE_URL = os.getenv("ACCOUNTS_SERVICE_URL", "http://localhost:50051")
+ACCOUNTS_GRPC_TARGET = os.getenv("ACCOUNTS_GRPC_TARGET", "localhost:50051")
+
+
+def timed(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{label:<28} mean {statistics.mean(samples) * 1000:9.3f} ms"
+        f"  p50 {statistics.median(samples) * 1000:9.3f} ms"
+        f"  p99 {p99 * 1000:9.3f} ms"
+    )
+
+
+def get_collection():
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise Exception("DB_URL environment variable is not set")
+    return MongoClient(db_url)["bank"]["accounts"]
+
+
+def sample_account_numbers(size):
+    accounts = get_collection().aggregate(
+        [{"$sample": {"size": size}}, {"$project": {"_id": 0, "account_number": 1}}]
+    )
+    return [account["account_number"] for account in accounts]
+
+
+def warn_if_cached(url):
+    try:
+        cache = requests.get(f"{url}/account-cache/stats", timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return
+    if cache.get("enabled"):
+        print(
+            f"warning: the account cache of {url} is enabled, single lookups are served from it;"
+            " restart the service with ACCOUNT_CACHE_ENABLED=false"
+        )
+
+
+def bench_batch(args):
+    account_numbers = sample_account_numbers(args.size)
+    print(f"{len(account_numbers)} accounts, {args.rounds} rounds, {args.protocol}")
+    if args.protocol == "http":
+        warn_if_cached(ACCOUNTS_SERVICE_URL)
+
+    if args.protocol == "grpc":
+        stub = accounts_pb2_grpc.AccountDetailsServiceStub(
+            grpc.insecure_channel(ACCOUNTS_GRPC_TARGET)
+        )
+
+        def single():
+            for account_number in account_numbers:
+                stub.getAccountDetails(GetAccountDetailRequest(account_number=account_number))
+
+        def batch():
+            stub.getAccountDetailsBatch(
+                GetAccountDetailsBatchRequest(account_numbers=account_numbers)
+            )
+    else:
+        session = requests.Session()
+
+        def single():
+            for account_number in account_numbers:
+                session.post(
+                    f"{ACCOUNTS_SERVICE_URL}/account-detail",
+                    json={"account_number": account_number},
+                )
+
+        def batch():
+            session.post(
+                f"{ACCOUNTS_SERVICE_URL}/account-detail-batch",
+                json={"account_numbers": account_numbers},
+            )
+
+    report(f"{len(account_numbers)} x getAccountDetails", timed(single, args.rounds))
+    report("1 x getAccountDetailsBatch", timed(batch, args.rounds))
+
+
+ACCOUNT_FIELDS = [
+    "account_number", "email_id", "account_type", "address", "govt_id_number",
+    "government_id_type", "name", "balance", "currency",
+]
+
+
+def make_account_document(i):
+    return {
+        "_id": ObjectId(),
+        "email_id": "corporate@example.com",
+        "account_type": f"Checking-{i}",
+        "address": f"{i} Olympus Mons Avenue, Mars",
+        "govt_id_number": f"{i:09d}",
+        "government_id_type": "Passport",
+        "name": "Corporate Customer",
+        "balance": 100.0 + i,
+        "currency": "USD",
+        "account_number": f"IBAN{1000000000000000 + i}",
+        "created_at": datetime.datetime.now(),
+    }
+
+
+def bench_projection(args):
+    # Simulates the wire: full documents before, server-side projected after
+    full = [bson.encode(make_account_document(i)) for i in range(args.accounts)]
+    projected = [
+        bson.encode({k: v for k, v in bson.decode(raw).items() if k in ACCOUNT_FIELDS})
+        for raw in full
+    ]
+
+    def before():
+        account_list = []
+        for raw in full:
+            account = bson.decode(raw)
+            account_list.append({
+                k: v
+                for k, v in account.items()
+                if k in [
+                    "account_number",
+                    "email_id",
+                    "account_type",
+                    "address",
+                    "govt_id_number",
+                    "government_id_type",
+                    "name",
+                    "balance",
+                    "currency",
+                ]
+            })
+        return GetAccountsResponse(accounts=[
+            Account(
+                account_number=account["account_number"],
+                email_id=account["email_id"],
+                account_type=account["account_type"],
+                address=account["address"],
+                govt_id_number=account["govt_id_number"],
+                government_id_type=account["government_id_type"],
+                name=account["name"],
+                balance=account["balance"],
+                currency=account["currency"],
+            )
+            for account in account_list
+        ])
+
+    def after():
+        accounts = [bson.decode(raw) for raw in projected]
+        return GetAccountsResponse(accounts=[Account(**account) for account in accounts])
+
+    print(f"{args.accounts} accounts per user, {args.rounds} rounds")
+    for label, fn in (("before (filter + copy)", before), ("after (projection)", after)):
+        samples = [s / args.accounts for s in timed(fn, args.rounds)]
+        print(f"{label:<28} {statistics.median(samples) * 1e6:9.3f} us/document")
+
+
+def make_create_request(run_id, i):
+    return {
+        "email_id": f"bench-{run_id}-{i}@example.com",
+        "account_type": "Checking",
+        "address": f"{i} Olympus Mons Avenue, Mars",
+        "govt_id_number": f"{i:09d}",
+        "government_id_type": "Passport",
+        "name": "Benchmark Customer",
+    }
+
+
+def bench_bulk_create(args):
+    run_id = uuid.uuid4().hex[:8]
+    single_rows = [make_create_request(f"{run_id}s", i) for i in range(args.accounts)]
+    batch_rows = [make_create_request(f"{run_id}b", i) for i in range(args.accounts)]
+    chunks = [batch_rows[i:i + args.chunk] for i in range(0, len(batch_rows), args.chunk)]
+
+    if args.protocol == "grpc":
+        stub = accounts_pb2_grpc.AccountDetailsServiceStub(
+            grpc.insecure_channel(ACCOUNTS_GRPC_TARGET)
+        )
+
+        def single():
+            for row in single_rows:
+                stub.createAccount(CreateAccountRequest(**row))
+
+        def batch():
+            for chunk in chunks:
+                stub.createAccountsBatch(CreateAccountsBatchRequest(
+                    accounts=[CreateAccountRequest(**row) for row in chunk]
+                ))
+    else:
+        session = requests.Session()
+
+        def single():
+            for row in single_rows:
+                session.post(f"{ACCOUNTS_SERVICE_URL}/create-account", json=row)
+
+        def batch():
+            for chunk in chunks:
+                session.post(
+                    f"{ACCOUNTS_SERVICE_URL}/create-accounts-batch", json={"accounts": chunk}
+                )
+
+    print(f"{args.accounts} accounts, chunks of {args.chunk}, {args.protocol}")
+    try:
+        for label, fn in (("createAccount", single), ("createAccountsBatch", batch)):
+            elapsed = timed(fn, 1)[0]
+            print(f"{label:<28} {elapsed:9.3f} s  {args.accounts / elapsed:12.1f} accounts/s")
+    finally:
+        get_collection().delete_many({"email_id": {"$regex": f"^bench-{run_id}"}})
+
+
+async def run_clients(target, concurrency, requests_per_client, account_numbers):
+    latencies = []
+    async with grpc.aio.insecure_channel(target) as channel:
+        stub = accounts_pb2_grpc.AccountDetailsServiceStub(channel)
+
+        async def client(offset):
+            for i in range(requests_per_client):
+                account_number = account_numbers[(offset + i) % len(account_numbers)]
+                start = time.perf_counter()
+                await stub.getAccountDetails(GetAccountDetailRequest(account_number=account_number))
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def bench_grpc_modes(args):
+    # Start the service once per mode (GRPC_SERVER_MODE=sync / aio, both
+    # with ACCOUNT_CACHE_ENABLED=false) and pass each as a labelled target;
+    # all clients share one asyncio event loop
+    account_numbers = sample_account_numbers(1000)
+    targets = [target.split("=", 1) for target in args.target]
+    print(f"{args.requests} getAccountDetails requests per client")
+    for label, target in targets:
+        for concurrency in args.concurrency:
+            latencies, elapsed = asyncio.run(
+                run_clients(target, concurrency, args.requests, account_numbers)
+            )
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{label:<6} {concurrency:>5} clients  {len(latencies) / elapsed:10.1f} req/s"
+                f"  p99 {p99 * 1000:9.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accounts service benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="N single getAccountDetails calls vs one batch call (service with ACCOUNT_CACHE_ENABLED=false)",
+    )
+    batch_parser.add_argument("--size", type=int, default=50)
+    batch_parser.add_argument("--rounds", type=int, default=20)
+    batch_parser.add_argument(
+        "--protocol", choices=["http", "grpc"],
+        default=os.getenv("SERVICE_PROTOCOL", "http").lower(),
+    )
+    batch_parser.set_defaults(func=bench_batch)
+
+    projection_parser = subparsers.add_parser(
+        "projection", help="per-document cost of getAccounts before and after projection"
+    )
+    projection_parser.add_argument("--accounts", type=int, default=5000)
+    projection_parser.add_argument("--rounds", type=int, default=20)
+    projection_parser.set_defaults(func=bench_projection)
+
+    bulk_create_parser = subparsers.add_parser(
+        "bulk-create", help="single createAccount calls vs createAccountsBatch"
+    )
+    bulk_create_parser.add_argument("--accounts", type=int, default=2000)
+    bulk_create_parser.add_argument("--chunk", type=int, default=1000)
+    bulk_create_parser.add_argument(
+        "--protocol", choices=["http", "grpc"],
+        default=os.getenv("SERVICE_PROTOCOL", "http").lower(),
+    )
+    bulk_create_parser.set_defaults(func=bench_bulk_create)
+
+    grpc_modes_parser = subparsers.add_parser(
+        "grpc-modes",
+        help="throughput and p99 of the sync and aio gRPC servers (with ACCOUNT_CACHE_ENABLED=false)",
+    )
+    grpc_modes_parser.add_argument(
+        "--target", action="append", required=True, help="label=host:port, repeatable"
+    )
+    grpc_modes_parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 1000])
+    grpc_modes_parser.add_argument("--requests", type=int, default=50)
+    grpc_modes_parser.set_defaults(func=bench_grpc_modes)
+
+    args = parser.parse_args()
+    args.func(args)
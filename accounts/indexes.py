@@ -0,0 +1,56 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Versioned index management for the collections owned by the accounts service.
+
+Runs at service startup (see accounts.py) or as a one-off:
+
+    python indexes.py           # apply pending index migrations
+    python indexes.py --check   # explain() the hot queries, exit 1 on COLLSCAN
+                                # or on duplicates blocking a pending unique index
+"""
+
+from pymongo import ASCENDING, IndexModel
+
+from migrations import IndexMigrations
+
+SERVICE_NAME = "accounts"
+
+# Append-only list of (version, collection, indexes to create, index names to
+# drop). Never edit an applied entry; add a new version instead.
+MIGRATIONS = [
+    (
+        1,
+        "accounts",
+        [
+            IndexModel(
+                [("account_number", ASCENDING)],
+                name="account_number_unique",
+                unique=True,
+            ),
+            IndexModel(
+                [("email_id", ASCENDING), ("account_type", ASCENDING)],
+                name="email_id_account_type_unique",
+                unique=True,
+            ),
+        ],
+        [],
+    ),
+]
+
+# Queries issued on the request path; each must be served by an index.
+HOT_QUERIES = [
+    ("accounts", {"account_number": "IBAN0000000000000000"}),
+    ("accounts", {"email_id": "check@example.com"}),
+    ("accounts", {"email_id": "check@example.com", "account_type": "Checking"}),
+]
+
+
+migrations = IndexMigrations(SERVICE_NAME, MIGRATIONS, HOT_QUERIES)
+ensure_indexes = migrations.ensure_indexes
+check_indexes = migrations.check_indexes
+
+
+if __name__ == "__main__":
+    migrations.main()
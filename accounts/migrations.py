@@ -0,0 +1,193 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Versioned index migrations, shared by the accounts, loan and
+transactions services.
+
+Each service's indexes.py declares its MIGRATIONS and HOT_QUERIES and runs
+them through IndexMigrations. This file is kept identical in every service
+(checked by .github/workflows/shared_modules.yml); change all copies
+together.
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+
+from pymongo.errors import OperationFailure
+from pymongo.mongo_client import MongoClient
+
+SCHEMA_VERSIONS_COLLECTION = "schema_versions"
+# Duplicate keys listed per index in a report
+DUPLICATE_SAMPLE_SIZE = 10
+
+
+class DuplicateKeysError(Exception):
+    """Existing documents violate a unique index a migration would build."""
+
+
+def find_duplicates(collection, index, sample_size=DUPLICATE_SAMPLE_SIZE):
+    """Return (number of duplicate keys, sample) for a unique IndexModel.
+
+    Each sample entry has the key values, the document count and up to
+    sample_size of their _ids. A missing field groups as null, as it does
+    in the index.
+    """
+    fields = list(index.document["key"])
+    pipeline = [
+        {"$group": {
+            "_id": {field.replace(".", "_"): f"${field}" for field in fields},
+            "count": {"$sum": 1},
+            "ids": {"$push": "$_id"},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$facet": {
+            "total": [{"$count": "keys"}],
+            "sample": [
+                {"$sort": {"count": -1}},
+                {"$limit": sample_size},
+                {"$project": {"count": 1, "ids": {"$slice": ["$ids", sample_size]}}},
+            ],
+        }},
+    ]
+    result = next(collection.aggregate(pipeline, allowDiskUse=True))
+    total = result["total"][0]["keys"] if result["total"] else 0
+    return total, [
+        {"key": group["_id"], "count": group["count"], "ids": group["ids"]}
+        for group in result["sample"]
+    ]
+
+
+def duplicates_report(reports):
+    lines = []
+    for version, collection_name, name, total, sample in reports:
+        lines.append(
+            f"migration {version}: {total} duplicate key(s) on {collection_name} block unique index {name}"
+        )
+        for group in sample:
+            ids = ", ".join(str(_id) for _id in group["ids"])
+            lines.append(f"  {group['key']}: {group['count']} documents ({ids})")
+    lines.append("Merge or remove the duplicate documents, then restart the service or run indexes.py.")
+    return "\n".join(lines)
+
+
+def _has_collscan(plan):
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(v) for v in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(v) for v in plan)
+    return False
+
+
+class IndexMigrations:
+    """Applies a service's index migrations.
+
+    migrations is an append-only list of (version, collection, indexes to
+    create, index names to drop); never edit an applied entry, add a new
+    version instead. hot_queries are (collection, query) pairs issued on
+    the request path, each of which must be served by an index.
+    """
+
+    def __init__(self, service_name, migrations, hot_queries):
+        self.service_name = service_name
+        self.migrations = migrations
+        self.hot_queries = hot_queries
+
+    def get_schema_version(self, db):
+        doc = db[SCHEMA_VERSIONS_COLLECTION].find_one({"_id": self.service_name})
+        return doc["version"] if doc else 0
+
+    def pending_duplicates(self, db):
+        """Duplicates blocking the unique indexes of pending migrations, as
+        (version, collection, index name, number of keys, sample) tuples."""
+        current = self.get_schema_version(db)
+        reports = []
+        for version, collection_name, indexes, _ in self.migrations:
+            if version <= current:
+                continue
+            for index in indexes:
+                if not index.document.get("unique"):
+                    continue
+                total, sample = find_duplicates(db[collection_name], index)
+                if total:
+                    reports.append((version, collection_name, index.document["name"], total, sample))
+        return reports
+
+    def ensure_indexes(self, db):
+        """Apply every migration newer than the recorded schema version.
+
+        create_indexes is a no-op for indexes that already exist with the
+        same spec and dropping a missing index is ignored, so re-running
+        after a partial failure is safe. Existing duplicates would make a
+        unique index build fail midway, so they are looked for first and
+        reported with DuplicateKeysError before any index is created.
+        """
+        current = self.get_schema_version(db)
+        reports = self.pending_duplicates(db)
+        if reports:
+            raise DuplicateKeysError(duplicates_report(reports))
+        for version, collection_name, indexes, dropped in self.migrations:
+            if version <= current:
+                continue
+            logging.debug(f"Applying index migration {version} on {collection_name}")
+            if indexes:
+                db[collection_name].create_indexes(indexes)
+            for name in dropped:
+                try:
+                    db[collection_name].drop_index(name)
+                except OperationFailure as e:
+                    if e.code != 27:  # IndexNotFound
+                        raise
+            db[SCHEMA_VERSIONS_COLLECTION].update_one(
+                {"_id": self.service_name},
+                {"$set": {"version": version, "applied_at": datetime.datetime.now()}},
+                upsert=True,
+            )
+            current = version
+        logging.debug(f"{self.service_name} schema at version {current}")
+        return current
+
+    def check_indexes(self, db):
+        """Return the hot queries whose winning plan contains a COLLSCAN."""
+        failures = []
+        for collection_name, query in self.hot_queries:
+            explain = db[collection_name].find(query).explain()
+            if _has_collscan(explain["queryPlanner"]["winningPlan"]):
+                logging.error(f"COLLSCAN on {collection_name} for query {query}")
+                failures.append((collection_name, query))
+        return failures
+
+    def main(self):
+        """Command line of indexes.py: apply pending migrations, or with
+        --check report COLLSCANs and blocking duplicates (exit 1 on any)."""
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        logging.basicConfig(level=logging.DEBUG)
+        logging.getLogger('pymongo').setLevel(logging.WARNING)
+
+        parser = argparse.ArgumentParser(description=f"Manage {self.service_name} service indexes")
+        parser.add_argument("--check", action="store_true",
+                            help="explain() the hot queries and fail on COLLSCAN or blocking duplicates")
+        args = parser.parse_args()
+
+        db_url = os.getenv("DB_URL")
+        if db_url is None:
+            raise Exception("DB_URL environment variable is not set")
+        db = MongoClient(db_url)["bank"]
+
+        if args.check:
+            reports = self.pending_duplicates(db)
+            if reports:
+                logging.error(duplicates_report(reports))
+            sys.exit(1 if self.check_indexes(db) or reports else 0)
+        try:
+            self.ensure_indexes(db)
+        except DuplicateKeysError as e:
+            logging.error(str(e))
+            sys.exit(1)
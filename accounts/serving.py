@@ -0,0 +1,57 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Production HTTP serving for the Flask apps.
+
+Selected with HTTP_SERVER_MODE=production. Runs the app under gunicorn with
+multi-threaded (gthread) workers, tuned through:
+
+    HTTP_WORKERS            worker processes (default 2 * CPUs + 1)
+    HTTP_THREADS            threads per worker (default 4)
+    HTTP_KEEPALIVE          keep-alive seconds (default 5)
+    HTTP_TIMEOUT            worker timeout seconds (default 30)
+    HTTP_GRACEFUL_TIMEOUT   seconds workers get to finish on reload/stop (default 30)
+    HTTP_MAX_REQUESTS       recycle a worker after this many requests (default 0, off)
+    HTTP_PRELOAD            import the app once in the master before forking (default true)
+
+Send SIGHUP to the master for a graceful reload of the workers. PyMongo
+resets its connection pools in each forked worker, so preloading is safe.
+"""
+
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def production_options(port):
+    return {
+        "bind": f"0.0.0.0:{port}",
+        "worker_class": "gthread",
+        "workers": int(os.getenv("HTTP_WORKERS", str(multiprocessing.cpu_count() * 2 + 1))),
+        "threads": int(os.getenv("HTTP_THREADS", "4")),
+        "keepalive": int(os.getenv("HTTP_KEEPALIVE", "5")),
+        "timeout": int(os.getenv("HTTP_TIMEOUT", "30")),
+        "graceful_timeout": int(os.getenv("HTTP_GRACEFUL_TIMEOUT", "30")),
+        "max_requests": int(os.getenv("HTTP_MAX_REQUESTS", "0")),
+        "preload_app": os.getenv("HTTP_PRELOAD", "true").lower() == "true",
+    }
+
+
+def serve(app, port):
+    ProductionServer(app, production_options(port)).run()
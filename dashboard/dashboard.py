@@ -9,7 +9,7 @@ import json
 # from google.protobuf.json_format import MessageToDict
 from flask_cors import CORS
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import grpc
 
 from dotenv import load_dotenv
@@ -28,6 +28,8 @@ from pymongo.mongo_client import MongoClient
 
 import requests as flask_client_requests
 
+from serving import serve
+
 # set logging to debug
 logging.basicConfig(level=logging.DEBUG)
 # Suppress pymongo DEBUG logs
@@ -52,6 +54,14 @@ if protocol is None:
 protocol = protocol.lower()
 logging.debug(f"microservice protocol: {protocol}")
 
+# HTTP server: "development" (Flask dev server) or "production" (gunicorn, see serving.py)
+http_server_mode = os.getenv("HTTP_SERVER_MODE", "development").lower()
+logging.debug(f"HTTP server mode: {http_server_mode}")
+
+# Werkzeug debugger for the development server; off unless FLASK_DEBUG is set
+flask_debug = os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true")
+logging.debug(f"Flask debug: {flask_debug}")
+
 
 client = MongoClient(uri)
 db = client["bank"]
@@ -62,6 +72,16 @@ app = Flask(__name__)
 CORS(app)
 
 
+# Optional non-negative integer form field; 0 when missing or empty
+def form_int(name):
+    value = request.form.get(name, "").strip()
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a non-negative integer")
+    return int(value)
+
+
 @app.route("/")
 def render_homepage():
     return f"Dashboard is running..."
@@ -263,6 +283,7 @@ def transaction_form():
             sender_account_type=sender_account_type,
             receiver_account_type=receiver_account_type,
             reason=reason,
+            idempotency_key=request.form.get("idempotency_key", ""),
         )
 
         logging.debug("Sending transaction request...")
@@ -312,6 +333,7 @@ def transaction_zelle():
             receiver_email=receiver_email,
             amount=amount,
             reason=reason,
+            idempotency_key=request.form.get("idempotency_key", ""),
         )
 
         logging.debug("Sending transaction request...")
@@ -331,6 +353,7 @@ def transaction_zelle():
             "receiver_email": request.form["receiver_email"],
             "amount": float(request.form["amount"]),
             "reason": request.form["reason"],
+            "idempotency_key": request.form.get("idempotency_key", ""),
         }
         response = flask_client_requests.post(f"http://{host_ip_port}/zelle", json=req)
         logging.debug(f"====================== {response.json()}")
@@ -354,14 +377,16 @@ def transaction_zelle():
     return render_template("transaction.html")
 
 
+# With a limit the request returns one page and its next_after cursor;
+# without one it returns the whole history, as it did before paging, by
+# following the cursor page by page
 @app.route("/transaction/history", methods=["GET", "POST"])
 def get_all_transactions():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = TransactionServiceStub(channel)
-
+    def __grpc(client, limit, after):
         account_number = request.form["account_number"]  # type: ignore
-        req = GetALLTransactionsRequest(account_number=account_number)
+        req = GetALLTransactionsRequest(
+            account_number=account_number, limit=limit, after=after
+        )
         response = client.getTransactionsHistory(req)
         transaction_history = []
         for r in response.transactions:
@@ -374,32 +399,108 @@ def get_all_transactions():
                 "transaction_id": r.transaction_id,
             }
             transaction_history.append(t)
-        return json.dumps({"response": transaction_history})
+        return transaction_history, response.next_after
 
-    def __flask():
-        req = {"account_number": request.form["account_number"]}
-        response = flask_client_requests.post(
+    def __flask(session, limit, after):
+        req = {
+            "account_number": request.form["account_number"],
+            "limit": limit,
+            "after": after,
+        }
+        response = session.post(
             f"http://{host_ip_port}/transaction-history", json=req
         )
         logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
+        page = response.json()
+        return page.get("transactions", []), page.get("next_after", "")
 
     transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
     host_ip_port = f"{transaction_host}:50052"
     if request.method == "POST":
-        # result = __grpc()
-        # result = __flask()
-        result = None
+        try:
+            limit = form_int("limit")
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        after = request.form.get("after", "")
+
+        # One channel (or HTTP session) for all pages of the request
         if protocol == "grpc":
-            result = __grpc()
+            connection = grpc.insecure_channel(host_ip_port)
+            client = TransactionServiceStub(connection)
+            get_page = lambda limit, after: __grpc(client, limit, after)
         else:
-            result = __flask()
+            connection = flask_client_requests.Session()
+            get_page = lambda limit, after: __flask(connection, limit, after)
+        try:
+            transaction_history, next_after = get_page(limit, after)
+            if not limit:
+                while next_after:
+                    page, next_after = get_page(0, next_after)
+                    transaction_history.extend(page)
+        finally:
+            connection.close()
+
+        result = json.dumps({"response": transaction_history, "next_after": next_after})
         logging.debug(f"---->Transaction response: {result}")
         return result
 
     return json.dumps({"response": None})
 
 
+# Relays the full history as NDJSON, one transaction per line, without
+# buffering it; closing the response cancels the upstream stream
+@app.route("/transaction/history/stream", methods=["POST"])
+def stream_all_transactions():
+    def __grpc():
+        channel = grpc.insecure_channel(host_ip_port)
+        client = TransactionServiceStub(channel)
+        req = StreamTransactionsRequest(
+            account_number=request.form["account_number"],
+            batch_size=batch_size,
+            after=request.form.get("after", ""),
+        )
+        call = client.streamTransactionsHistory(req)
+        try:
+            for r in call:
+                t = {
+                    "account_number": r.account_number,
+                    "amount": r.amount,
+                    "reason": r.reason,
+                    "time_stamp": r.time_stamp,
+                    "type": r.type,
+                    "transaction_id": r.transaction_id,
+                }
+                yield json.dumps(t) + "\n"
+        finally:
+            call.cancel()
+            channel.close()
+
+    def __flask():
+        req = {
+            "account_number": request.form["account_number"],
+            "batch_size": batch_size,
+            "after": request.form.get("after", ""),
+        }
+        response = flask_client_requests.post(
+            f"http://{host_ip_port}/stream-transaction-history", json=req, stream=True
+        )
+        try:
+            for line in response.iter_lines():
+                if line:
+                    yield line + b"\n"
+        finally:
+            response.close()
+
+    transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
+    host_ip_port = f"{transaction_host}:50052"
+    try:
+        batch_size = form_int("batch_size")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    result = __grpc() if protocol == "grpc" else __flask()
+    return Response(stream_with_context(result), mimetype="application/x-ndjson")
+
+
 @app.route("/transaction/transaction-with-id", methods=["GET", "POST"])
 def GetTransactionByID():
     def __grpc():
@@ -722,4 +823,10 @@ def get_specific_atm(id):
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    port = 5000
+
+    if http_server_mode == "production":
+        logging.debug(f"Starting production HTTP server on port {port}")
+        serve(app, port)
+    else:
+        app.run(host="0.0.0.0", port=port, debug=flask_debug)
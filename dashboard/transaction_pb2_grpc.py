@@ -5,11 +5,31 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
+import warnings
 
 import transaction_pb2 as transaction__pb2
 
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
 
-class TransactionServiceStub(object):
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in transaction_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class TransactionServiceStub:
     """Missing associated documentation comment in .proto file."""
 
     def __init__(self, channel):
@@ -22,25 +42,40 @@ class TransactionServiceStub(object):
                 '/TransactionService/sendMoney',
                 request_serializer=transaction__pb2.TransactionRequest.SerializeToString,
                 response_deserializer=transaction__pb2.TransactionResponse.FromString,
-                )
+                _registered_method=True)
         self.getTransactionsHistory = channel.unary_unary(
                 '/TransactionService/getTransactionsHistory',
                 request_serializer=transaction__pb2.GetALLTransactionsRequest.SerializeToString,
                 response_deserializer=transaction__pb2.GetALLTransactionsResponse.FromString,
-                )
+                _registered_method=True)
         self.Zelle = channel.unary_unary(
                 '/TransactionService/Zelle',
                 request_serializer=transaction__pb2.ZelleRequest.SerializeToString,
                 response_deserializer=transaction__pb2.TransactionResponse.FromString,
-                )
+                _registered_method=True)
         self.getTransactionByID = channel.unary_unary(
                 '/TransactionService/getTransactionByID',
                 request_serializer=transaction__pb2.TransactionByIDRequest.SerializeToString,
                 response_deserializer=transaction__pb2.Transaction.FromString,
-                )
+                _registered_method=True)
+        self.streamTransactionsHistory = channel.unary_stream(
+                '/TransactionService/streamTransactionsHistory',
+                request_serializer=transaction__pb2.StreamTransactionsRequest.SerializeToString,
+                response_deserializer=transaction__pb2.Transaction.FromString,
+                _registered_method=True)
+        self.sendMoneyBatch = channel.unary_unary(
+                '/TransactionService/sendMoneyBatch',
+                request_serializer=transaction__pb2.BatchTransactionRequest.SerializeToString,
+                response_deserializer=transaction__pb2.BatchTransactionResponse.FromString,
+                _registered_method=True)
+        self.getTransactionSummary = channel.unary_unary(
+                '/TransactionService/getTransactionSummary',
+                request_serializer=transaction__pb2.TransactionSummaryRequest.SerializeToString,
+                response_deserializer=transaction__pb2.TransactionSummaryResponse.FromString,
+                _registered_method=True)
 
 
-class TransactionServiceServicer(object):
+class TransactionServiceServicer:
     """Missing associated documentation comment in .proto file."""
 
     def sendMoney(self, request, context):
@@ -67,6 +102,24 @@ class TransactionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def streamTransactionsHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def sendMoneyBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getTransactionSummary(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TransactionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -90,14 +143,30 @@ def add_TransactionServiceServicer_to_server(servicer, server):
                     request_deserializer=transaction__pb2.TransactionByIDRequest.FromString,
                     response_serializer=transaction__pb2.Transaction.SerializeToString,
             ),
+            'streamTransactionsHistory': grpc.unary_stream_rpc_method_handler(
+                    servicer.streamTransactionsHistory,
+                    request_deserializer=transaction__pb2.StreamTransactionsRequest.FromString,
+                    response_serializer=transaction__pb2.Transaction.SerializeToString,
+            ),
+            'sendMoneyBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.sendMoneyBatch,
+                    request_deserializer=transaction__pb2.BatchTransactionRequest.FromString,
+                    response_serializer=transaction__pb2.BatchTransactionResponse.SerializeToString,
+            ),
+            'getTransactionSummary': grpc.unary_unary_rpc_method_handler(
+                    servicer.getTransactionSummary,
+                    request_deserializer=transaction__pb2.TransactionSummaryRequest.FromString,
+                    response_serializer=transaction__pb2.TransactionSummaryResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'TransactionService', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('TransactionService', rpc_method_handlers)
 
 
  # This class is part of an EXPERIMENTAL API.
-class TransactionService(object):
+class TransactionService:
     """Missing associated documentation comment in .proto file."""
 
     @staticmethod
@@ -111,11 +180,21 @@ class TransactionService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/TransactionService/sendMoney',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/sendMoney',
             transaction__pb2.TransactionRequest.SerializeToString,
             transaction__pb2.TransactionResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def getTransactionsHistory(request,
@@ -128,11 +207,21 @@ class TransactionService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/TransactionService/getTransactionsHistory',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/getTransactionsHistory',
             transaction__pb2.GetALLTransactionsRequest.SerializeToString,
             transaction__pb2.GetALLTransactionsResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def Zelle(request,
@@ -145,11 +234,21 @@ class TransactionService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/TransactionService/Zelle',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/Zelle',
             transaction__pb2.ZelleRequest.SerializeToString,
             transaction__pb2.TransactionResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def getTransactionByID(request,
@@ -162,8 +261,99 @@ class TransactionService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/TransactionService/getTransactionByID',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/getTransactionByID',
             transaction__pb2.TransactionByIDRequest.SerializeToString,
             transaction__pb2.Transaction.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def streamTransactionsHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/TransactionService/streamTransactionsHistory',
+            transaction__pb2.StreamTransactionsRequest.SerializeToString,
+            transaction__pb2.Transaction.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def sendMoneyBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/sendMoneyBatch',
+            transaction__pb2.BatchTransactionRequest.SerializeToString,
+            transaction__pb2.BatchTransactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getTransactionSummary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/getTransactionSummary',
+            transaction__pb2.TransactionSummaryRequest.SerializeToString,
+            transaction__pb2.TransactionSummaryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
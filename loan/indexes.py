@@ -0,0 +1,48 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Versioned index management for the collections owned by the loan service.
+
+Runs at service startup (see loan.py) or as a one-off:
+
+    python indexes.py           # apply pending index migrations
+    python indexes.py --check   # explain() the hot queries, exit 1 on COLLSCAN
+                                # or on duplicates blocking a pending unique index
+"""
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from migrations import IndexMigrations
+
+SERVICE_NAME = "loan"
+
+# Append-only list of (version, collection, indexes to create, index names to
+# drop). Never edit an applied entry; add a new version instead.
+MIGRATIONS = [
+    (
+        1,
+        "loans",
+        [
+            IndexModel(
+                [("email", ASCENDING), ("timestamp", DESCENDING)],
+                name="email_timestamp",
+            ),
+        ],
+        [],
+    ),
+]
+
+# Queries issued on the request path; each must be served by an index.
+HOT_QUERIES = [
+    ("loans", {"email": "check@example.com"}),
+]
+
+
+migrations = IndexMigrations(SERVICE_NAME, MIGRATIONS, HOT_QUERIES)
+ensure_indexes = migrations.ensure_indexes
+check_indexes = migrations.check_indexes
+
+
+if __name__ == "__main__":
+    migrations.main()
@@ -19,6 +19,9 @@ logging.getLogger('pymongo').setLevel(logging.WARNING)
 
 from loan_pb2 import *
 import loan_pb2_grpc
+from indexes import ensure_indexes
+from serving import serve
+from accounts_client import AccountsClientError, accounts_client_from_env
 
 from pymongo.mongo_client import MongoClient
 
@@ -41,15 +44,19 @@ protocol = protocol.lower()
 
 logging.debug(f"microservice protocol: {protocol}")
 
+# HTTP server: "development" (Flask dev server) or "production" (gunicorn, see serving.py)
+http_server_mode = os.getenv("HTTP_SERVER_MODE", "development").lower()
+logging.debug(f"HTTP server mode: {http_server_mode}")
+
 
 
 client = MongoClient(uri)
 db = client["bank"]
 collection_loans = db["loans"]
 
-ACCOUNTS_SERVICE_URL = os.getenv("ACCOUNTS_SERVICE_URL")
-if not ACCOUNTS_SERVICE_URL:
-    raise Exception("ACCOUNTS_SERVICE_URL environment variable is not set")
+# Pooled client for the accounts service, see accounts_client.py; in gRPC
+# mode the hop to accounts is gRPC too
+accounts_client = accounts_client_from_env(default_transport=protocol)
 
 class LoanGeneric:
     def ProcessLoanRequest(self, request_data):
@@ -142,22 +149,8 @@ class LoanGeneric:
 
     def __getAccount(self, account_num):
         try:
-            # Prepare payload for Accounts API
-            payload = {
-                "account_number": account_num
-            }
-            logging.debug(f"Sending POST request to Accounts Service to get account details: {payload}")
-
-            # Send POST request to Accounts Service's /account-detail endpoint
-            response = requests.post(f"{ACCOUNTS_SERVICE_URL}/account-detail", json=payload, timeout=5)
-
-            # Check HTTP status code
-            if response.status_code != 200:
-                logging.error(f"Error in request to Accounts Service: {response.status_code} - {response.text}")
-                return None
-
-            # Process response
-            account = response.json()
+            logging.debug(f"Requesting account details from Accounts Service: {account_num}")
+            account = accounts_client.get_account(account_num)
             if account:
                 logging.debug(f"Account details retrieved: {account}")
                 return account
@@ -165,12 +158,9 @@ class LoanGeneric:
                 logging.debug("No account found with the provided account number.")
                 return None
 
-        except requests.exceptions.RequestException as e:
+        except AccountsClientError as e:
             logging.error(f"Exception during communication with Accounts Service: {e}")
             return None
-        except ValueError as e:
-            logging.error(f"Error parsing JSON response: {e}")
-            return None
 
 
     def __approveLoan(self, account, amount):
@@ -178,39 +168,20 @@ class LoanGeneric:
             logging.debug("Loan amount less than minimum required.")
             return False
 
-        new_balance = account["balance"] + amount
-
-        # Prepare payload for updating balance
-        payload = {
-            "account_number": account["account_number"],
-            "new_balance": new_balance
-        }
-
         try:
-            logging.debug(f"Sending POST request to Accounts Service to update balance: {payload}")
-
-            # Send POST request to Accounts Service's /update-balance endpoint
-            response = requests.post(f"{ACCOUNTS_SERVICE_URL}/update-balance", json=payload, timeout=5)
-
-            # Check HTTP status code
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("success"):
-                    logging.debug("Balance updated successfully via Accounts Service.")
-                    return True
-                else:
-                    logging.error("Failed to update balance via Accounts Service.")
-                    return False
+            # Credit the loan amount atomically
+            logging.debug(f"Crediting {amount} to {account['account_number']} via Accounts Service")
+            result = accounts_client.adjust_balance(account["account_number"], amount)
+            if result.get("success"):
+                logging.debug("Balance updated successfully via Accounts Service.")
+                return True
             else:
-                logging.error(f"Error updating balance via Accounts Service: {response.status_code} - {response.text}")
+                logging.error(f"Failed to update balance via Accounts Service: {result.get('message')}")
                 return False
 
-        except requests.exceptions.RequestException as e:
+        except AccountsClientError as e:
             logging.error(f"Exception during communication with Accounts Service: {e}")
             return False
-        except ValueError as e:
-            logging.error(f"Error parsing JSON response: {e}")
-            return False
 
 
 class LoanService(loan_pb2_grpc.LoanServiceServicer):
@@ -283,12 +254,17 @@ def serverGRPC(port):
     server.wait_for_termination()
 
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0' ,port=port, debug=True)
+    if http_server_mode == "production":
+        logging.debug(f"Starting production HTTP server on port {port}")
+        serve(app, port)
+    else:
+        logging.debug(f"Starting Flask server on port {port}")
+        app.run(host='0.0.0.0' ,port=port, debug=True)
 
 
 if __name__ == "__main__":
     port =  50053
+    ensure_indexes(db)
 
     if protocol == "grpc":
         serverGRPC(port)
@@ -5,11 +5,31 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
+import warnings
 
 import loan_pb2 as loan__pb2
 
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
 
-class LoanServiceStub(object):
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in loan_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class LoanServiceStub:
     """Missing associated documentation comment in .proto file."""
 
     def __init__(self, channel):
@@ -22,15 +42,15 @@ class LoanServiceStub(object):
                 '/LoanService/ProcessLoanRequest',
                 request_serializer=loan__pb2.LoanRequest.SerializeToString,
                 response_deserializer=loan__pb2.LoanResponse.FromString,
-                )
+                _registered_method=True)
         self.getLoanHistory = channel.unary_unary(
                 '/LoanService/getLoanHistory',
                 request_serializer=loan__pb2.LoansHistoryRequest.SerializeToString,
                 response_deserializer=loan__pb2.LoansHistoryResponse.FromString,
-                )
+                _registered_method=True)
 
 
-class LoanServiceServicer(object):
+class LoanServiceServicer:
     """Missing associated documentation comment in .proto file."""
 
     def ProcessLoanRequest(self, request, context):
@@ -62,10 +82,11 @@ def add_LoanServiceServicer_to_server(servicer, server):
     generic_handler = grpc.method_handlers_generic_handler(
             'LoanService', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('LoanService', rpc_method_handlers)
 
 
  # This class is part of an EXPERIMENTAL API.
-class LoanService(object):
+class LoanService:
     """Missing associated documentation comment in .proto file."""
 
     @staticmethod
@@ -79,11 +100,21 @@ class LoanService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/LoanService/ProcessLoanRequest',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/ProcessLoanRequest',
             loan__pb2.LoanRequest.SerializeToString,
             loan__pb2.LoanResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def getLoanHistory(request,
@@ -96,8 +127,18 @@ class LoanService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request, target, '/LoanService/getLoanHistory',
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/getLoanHistory',
             loan__pb2.LoansHistoryRequest.SerializeToString,
             loan__pb2.LoansHistoryResponse.FromString,
-            options, channel_credentials,
-            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,88 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+from collections import OrderedDict
+import threading
+import time
+
+# Cached marker for "no account with this email"
+_NOT_FOUND = object()
+
+
+class AccountResolver:
+    """Bounded LRU cache of email (and account type) -> account number.
+
+    lookup(email, account_type) returns the account dict or None; errors it
+    raises are passed through and not cached. Found numbers are kept for ttl
+    seconds, misses for negative_ttl seconds. Only the mapping is cached,
+    never balances. Safe to share between the gRPC worker threads and Flask
+    request threads. When disabled every call goes to lookup.
+    """
+
+    def __init__(self, lookup, max_size=10000, ttl=300.0, negative_ttl=5.0, enabled=True):
+        self.lookup = lookup
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled and max_size > 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def resolve(self, email, account_type=None):
+        """Returns (account_number or None, cached)."""
+        key = (email, account_type or "")
+        if self.enabled:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    if entry[0] is _NOT_FOUND:
+                        self.negative_hits += 1
+                        return None, True
+                    self.hits += 1
+                    return entry[0], True
+                self._entries.pop(key, None)
+                self.misses += 1
+
+        account = self.lookup(email, account_type)
+        account_number = account["account_number"] if account else None
+        if self.enabled:
+            with self._lock:
+                if account_number is None:
+                    self._entries[key] = (_NOT_FOUND, time.monotonic() + self.negative_ttl)
+                else:
+                    self._entries[key] = (account_number, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return account_number, False
+
+    def invalidate(self, email, account_type=None):
+        with self._lock:
+            self._entries.pop((email, account_type or ""), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            }
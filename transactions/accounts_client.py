@@ -0,0 +1,295 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Client for the accounts service, shared by the transactions and loan services.
+
+Both transports implement the same interface:
+
+    get_account(account_number)                -> dict or None
+    get_accounts(account_numbers)              -> {account_number: dict}, missing omitted
+    get_account_by_email(email, account_type)  -> dict or None
+    adjust_balance(account_number, delta, expected_version=None)
+                                               -> {"success", "balance", "version", "message"}
+    credit_accounts({account_number: amount})  -> {account_number: credited}
+
+and raise AccountsClientError when the accounts service cannot be reached
+or answers with an error. Reads are idempotent and retried with jittered
+exponential backoff; balance changes are not retried, since a request that
+timed out may still have been applied.
+
+Tuned through:
+
+    ACCOUNTS_CLIENT_TRANSPORT       "http" or "grpc" (default: the service's SERVICE_PROTOCOL)
+    ACCOUNTS_SERVICE_URL            base URL for the HTTP transport
+    ACCOUNTS_GRPC_TARGET            host:port for the gRPC transport (default accounts:50051)
+    ACCOUNTS_POOL_CONNECTIONS       HTTP connection pools to cache (default 10)
+    ACCOUNTS_POOL_MAXSIZE           HTTP keep-alive connections per pool (default 20)
+    ACCOUNTS_CONNECT_TIMEOUT        seconds (default 2)
+    ACCOUNTS_READ_TIMEOUT           seconds, also the gRPC deadline (default 5)
+    ACCOUNTS_RETRIES                extra attempts for reads (default 2)
+    ACCOUNTS_RETRY_BACKOFF          base backoff seconds (default 0.05)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import grpc
+import requests
+from requests.adapters import HTTPAdapter
+
+ACCOUNT_DETAIL_FIELDS = ("account_number", "name", "balance", "currency", "email_id", "account_type", "version")
+
+
+class AccountsClientError(Exception):
+    pass
+
+
+def _backoff(attempt, base):
+    # Full jitter: spreads retries from many callers across the window
+    time.sleep(random.uniform(0, base * (2 ** attempt)))
+
+
+class HttpAccountsClient:
+    """Accounts client over HTTP JSON with a pooled keep-alive session.
+
+    The session is created on first use in each process, so importing the
+    client before gunicorn forks its workers does not share sockets.
+    """
+
+    def __init__(self, base_url, pool_connections=10, pool_maxsize=20,
+                 connect_timeout=2.0, read_timeout=5.0, retries=2, backoff=0.05):
+        self.base_url = base_url.rstrip("/")
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def _post(self, path, payload, idempotent):
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                return self._get_session().post(
+                    f"{self.base_url}{path}", json=payload, timeout=self.timeout
+                )
+            except requests.exceptions.RequestException as e:
+                if attempt + 1 == attempts:
+                    raise AccountsClientError(f"POST {path} failed: {e}") from e
+                logging.debug(f"POST {path} failed, retrying: {e}")
+                _backoff(attempt, self.backoff)
+
+    def _json(self, response):
+        try:
+            return response.json()
+        except ValueError as e:
+            raise AccountsClientError(f"Invalid response from accounts service: {e}") from e
+
+    def get_account(self, account_number):
+        response = self._post("/account-detail", {"account_number": account_number}, idempotent=True)
+        if response.status_code != 200:
+            raise AccountsClientError(f"/account-detail returned {response.status_code}")
+        return self._json(response) or None
+
+    def get_accounts(self, account_numbers):
+        response = self._post(
+            "/account-detail-batch", {"account_numbers": list(account_numbers)}, idempotent=True
+        )
+        if response.status_code != 200:
+            raise AccountsClientError(f"/account-detail-batch returned {response.status_code}")
+        return {
+            account_number: result["account"]
+            for account_number, result in self._json(response).items()
+            if result["found"]
+        }
+
+    def get_account_by_email(self, email, account_type=None):
+        payload = {"email_id": email}
+        if account_type:
+            payload["account_type"] = account_type
+        response = self._post("/get-account-by-email", payload, idempotent=True)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise AccountsClientError(f"/get-account-by-email returned {response.status_code}")
+        return self._json(response)
+
+    def adjust_balance(self, account_number, delta, expected_version=None):
+        payload = {"account_number": account_number, "delta": delta}
+        if expected_version is not None:
+            payload["expected_version"] = expected_version
+        response = self._post("/adjust-balance", payload, idempotent=False)
+        # 409 (insufficient balance, version conflict) and 404 (no such
+        # account) carry a result body
+        if response.status_code not in (200, 404, 409):
+            raise AccountsClientError(f"/adjust-balance returned {response.status_code}")
+        return self._json(response)
+
+    def credit_accounts(self, credits):
+        payload = {
+            "credits": [
+                {"account_number": account_number, "amount": amount}
+                for account_number, amount in credits.items()
+            ]
+        }
+        response = self._post("/credit-accounts-batch", payload, idempotent=False)
+        if response.status_code != 200:
+            raise AccountsClientError(f"/credit-accounts-batch returned {response.status_code}")
+        return self._json(response)["credited"]
+
+
+class GrpcAccountsClient:
+    """Accounts client over one long-lived gRPC channel.
+
+    The channel is opened on first use in each process, so importing the
+    client before gunicorn forks its workers is safe.
+    """
+
+    RETRYABLE = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+    def __init__(self, target, timeout=5.0, retries=2, backoff=0.05):
+        # Generated in the Dockerfile; only needed by this transport
+        import accounts_pb2
+        import accounts_pb2_grpc
+
+        self.pb2 = accounts_pb2
+        self.pb2_grpc = accounts_pb2_grpc
+        self.target = target
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._channel = None
+        self._stub = None
+        self._pid = None
+
+    def _get_stub(self):
+        with self._lock:
+            if self._stub is None or self._pid != os.getpid():
+                self._channel = grpc.insecure_channel(self.target)
+                self._stub = self.pb2_grpc.AccountDetailsServiceStub(self._channel)
+                self._pid = os.getpid()
+            return self._stub
+
+    def _call(self, method, request, idempotent):
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                return getattr(self._get_stub(), method)(request, timeout=self.timeout)
+            except grpc.RpcError as e:
+                if attempt + 1 == attempts or e.code() not in self.RETRYABLE:
+                    raise AccountsClientError(f"{method} failed: {e.code()} {e.details()}") from e
+                logging.debug(f"{method} failed, retrying: {e.code()}")
+                _backoff(attempt, self.backoff)
+
+    def close(self):
+        with self._lock:
+            if self._channel is not None:
+                self._channel.close()
+            self._channel = self._stub = None
+
+    @staticmethod
+    def _to_dict(message):
+        return {field: getattr(message, field) for field in ACCOUNT_DETAIL_FIELDS}
+
+    def get_account(self, account_number):
+        account = self._call(
+            "getAccountDetails",
+            self.pb2.GetAccountDetailRequest(account_number=account_number),
+            idempotent=True,
+        )
+        # An empty AccountDetail means not found
+        return self._to_dict(account) if account.account_number else None
+
+    def get_accounts(self, account_numbers):
+        response = self._call(
+            "getAccountDetailsBatch",
+            self.pb2.GetAccountDetailsBatchRequest(account_numbers=list(account_numbers)),
+            idempotent=True,
+        )
+        return {
+            account_number: self._to_dict(result.account)
+            for account_number, result in response.accounts.items()
+            if result.found
+        }
+
+    def get_account_by_email(self, email, account_type=None):
+        response = self._call(
+            "GetAccountByEmail",
+            self.pb2.GetAccountByEmailRequest(email_id=email, account_type=account_type or ""),
+            idempotent=True,
+        )
+        return self._to_dict(response) if response.found else None
+
+    def adjust_balance(self, account_number, delta, expected_version=None):
+        response = self._call(
+            "adjustBalance",
+            self.pb2.AdjustBalanceRequest(
+                account_number=account_number, delta=delta, expected_version=expected_version
+            ),
+            idempotent=False,
+        )
+        return {
+            "success": response.success,
+            "balance": response.balance,
+            "version": response.version,
+            "message": response.message,
+        }
+
+    def credit_accounts(self, credits):
+        response = self._call(
+            "creditAccountsBatch",
+            self.pb2.CreditAccountsBatchRequest(
+                credits=[
+                    self.pb2.AccountCredit(account_number=account_number, amount=amount)
+                    for account_number, amount in credits.items()
+                ]
+            ),
+            idempotent=False,
+        )
+        return dict(response.credited)
+
+
+def accounts_client_from_env(default_transport="http"):
+    transport = os.getenv("ACCOUNTS_CLIENT_TRANSPORT", default_transport).lower()
+    read_timeout = float(os.getenv("ACCOUNTS_READ_TIMEOUT", "5"))
+    retries = int(os.getenv("ACCOUNTS_RETRIES", "2"))
+    backoff = float(os.getenv("ACCOUNTS_RETRY_BACKOFF", "0.05"))
+
+    if transport == "grpc":
+        target = os.getenv("ACCOUNTS_GRPC_TARGET", "accounts:50051")
+        logging.debug(f"accounts client: gRPC {target}")
+        return GrpcAccountsClient(target, timeout=read_timeout, retries=retries, backoff=backoff)
+
+    base_url = os.getenv("ACCOUNTS_SERVICE_URL")
+    if not base_url:
+        raise Exception("ACCOUNTS_SERVICE_URL environment variable is not set")
+    logging.debug(f"accounts client: HTTP {base_url}")
+    return HttpAccountsClient(
+        base_url,
+        pool_connections=int(os.getenv("ACCOUNTS_POOL_CONNECTIONS", "10")),
+        pool_maxsize=int(os.getenv("ACCOUNTS_POOL_MAXSIZE", "20")),
+        connect_timeout=float(os.getenv("ACCOUNTS_CONNECT_TIMEOUT", "2")),
+        read_timeout=read_timeout,
+        retries=retries,
+        backoff=backoff,
+    )
@@ -0,0 +1,94 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: accounts.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'accounts.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x61\x63\x63ounts.proto\"\xbf\x01\n\x07\x41\x63\x63ount\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x10\n\x08\x65mail_id\x18\x02 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x03 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x04 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x05 \x01(\t\x12\x1a\n\x12government_id_type\x18\x06 \x01(\t\x12\x0c\n\x04name\x18\x07 \x01(\t\x12\x10\n\x08\x63urrency\x18\x08 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\t \x01(\x01\"\x91\x01\n\x14\x43reateAccountRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x02 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x03 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x04 \x01(\t\x12\x1a\n\x12government_id_type\x18\x05 \x01(\t\x12\x0c\n\x04name\x18\x06 \x01(\t\"\'\n\x15\x43reateAccountResponse\x12\x0e\n\x06result\x18\x01 \x01(\x08\"E\n\x1a\x43reateAccountsBatchRequest\x12\'\n\x08\x61\x63\x63ounts\x18\x01 \x03(\x0b\x32\x15.CreateAccountRequest\"^\n\x13\x43reateAccountResult\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x03 \x01(\t\x12\x0f\n\x07message\x18\x04 \x01(\t\"D\n\x1b\x43reateAccountsBatchResponse\x12%\n\x07results\x18\x01 \x03(\x0b\x32\x14.CreateAccountResult\">\n\x12GetAccountsRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x02 \x01(\t\"1\n\x13GetAccountsResponse\x12\x1a\n\x08\x61\x63\x63ounts\x18\x01 \x03(\x0b\x32\x08.Account\"S\n\x15StreamAccountsRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x02 \x01(\t\x12\x12\n\nbatch_size\x18\x03 \x01(\x05\"\x91\x01\n\rAccountDetail\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\x03 \x01(\x01\x12\x10\n\x08\x63urrency\x18\x04 \x01(\t\x12\x10\n\x08\x65mail_id\x18\x05 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x06 \x01(\t\x12\x0f\n\x07version\x18\x07 \x01(\x03\"1\n\x17GetAccountDetailRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\"8\n\x1dGetAccountDetailsBatchRequest\x12\x17\n\x0f\x61\x63\x63ount_numbers\x18\x01 \x03(\t\"E\n\x13\x41\x63\x63ountDetailResult\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12\x1f\n\x07\x61\x63\x63ount\x18\x02 \x01(\x0b\x32\x0e.AccountDetail\"\xa8\x01\n\x1eGetAccountDetailsBatchResponse\x12?\n\x08\x61\x63\x63ounts\x18\x01 \x03(\x0b\x32-.GetAccountDetailsBatchResponse.AccountsEntry\x1a\x45\n\rAccountsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.AccountDetailResult:\x02\x38\x01\"C\n\x14UpdateBalanceRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x13\n\x0bnew_balance\x18\x02 \x01(\x01\"(\n\x15UpdateBalanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"q\n\x14\x41\x64justBalanceRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\r\n\x05\x64\x65lta\x18\x02 \x01(\x01\x12\x1d\n\x10\x65xpected_version\x18\x03 \x01(\x03H\x00\x88\x01\x01\x42\x13\n\x11_expected_version\"[\n\x15\x41\x64justBalanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x01\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x0f\n\x07version\x18\x04 \x01(\x03\"7\n\rAccountCredit\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\"=\n\x1a\x43reditAccountsBatchRequest\x12\x1f\n\x07\x63redits\x18\x01 \x03(\x0b\x32\x0e.AccountCredit\"\x8c\x01\n\x1b\x43reditAccountsBatchResponse\x12<\n\x08\x63redited\x18\x01 \x03(\x0b\x32*.CreditAccountsBatchResponse.CreditedEntry\x1a/\n\rCreditedEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x08:\x02\x38\x01\"B\n\x18GetAccountByEmailRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x02 \x01(\t\"\xac\x01\n\x19GetAccountByEmailResponse\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\x03 \x01(\x01\x12\x10\n\x08\x63urrency\x18\x04 \x01(\t\x12\x10\n\x08\x65mail_id\x18\x05 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x06 \x01(\t\x12\r\n\x05\x66ound\x18\x07 \x01(\x08\x12\x0f\n\x07version\x18\x08 \x01(\x03\x32\xd1\x05\n\x15\x41\x63\x63ountDetailsService\x12=\n\x11getAccountDetails\x12\x18.GetAccountDetailRequest\x1a\x0e.AccountDetail\x12>\n\rcreateAccount\x12\x15.CreateAccountRequest\x1a\x16.CreateAccountResponse\x12\x38\n\x0bgetAccounts\x12\x13.GetAccountsRequest\x1a\x14.GetAccountsResponse\x12>\n\rupdateBalance\x12\x15.UpdateBalanceRequest\x1a\x16.UpdateBalanceResponse\x12J\n\x11GetAccountByEmail\x12\x19.GetAccountByEmailRequest\x1a\x1a.GetAccountByEmailResponse\x12>\n\radjustBalance\x12\x15.AdjustBalanceRequest\x1a\x16.AdjustBalanceResponse\x12Y\n\x16getAccountDetailsBatch\x12\x1e.GetAccountDetailsBatchRequest\x1a\x1f.GetAccountDetailsBatchResponse\x12\x34\n\x0estreamAccounts\x12\x16.StreamAccountsRequest\x1a\x08.Account0\x01\x12P\n\x13\x63reateAccountsBatch\x12\x1b.CreateAccountsBatchRequest\x1a\x1c.CreateAccountsBatchResponse\x12P\n\x13\x63reditAccountsBatch\x12\x1b.CreditAccountsBatchRequest\x1a\x1c.CreditAccountsBatchResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'accounts_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE_ACCOUNTSENTRY']._loaded_options = None
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE_ACCOUNTSENTRY']._serialized_options = b'8\001'
+  _globals['_CREDITACCOUNTSBATCHRESPONSE_CREDITEDENTRY']._loaded_options = None
+  _globals['_CREDITACCOUNTSBATCHRESPONSE_CREDITEDENTRY']._serialized_options = b'8\001'
+  _globals['_ACCOUNT']._serialized_start=19
+  _globals['_ACCOUNT']._serialized_end=210
+  _globals['_CREATEACCOUNTREQUEST']._serialized_start=213
+  _globals['_CREATEACCOUNTREQUEST']._serialized_end=358
+  _globals['_CREATEACCOUNTRESPONSE']._serialized_start=360
+  _globals['_CREATEACCOUNTRESPONSE']._serialized_end=399
+  _globals['_CREATEACCOUNTSBATCHREQUEST']._serialized_start=401
+  _globals['_CREATEACCOUNTSBATCHREQUEST']._serialized_end=470
+  _globals['_CREATEACCOUNTRESULT']._serialized_start=472
+  _globals['_CREATEACCOUNTRESULT']._serialized_end=566
+  _globals['_CREATEACCOUNTSBATCHRESPONSE']._serialized_start=568
+  _globals['_CREATEACCOUNTSBATCHRESPONSE']._serialized_end=636
+  _globals['_GETACCOUNTSREQUEST']._serialized_start=638
+  _globals['_GETACCOUNTSREQUEST']._serialized_end=700
+  _globals['_GETACCOUNTSRESPONSE']._serialized_start=702
+  _globals['_GETACCOUNTSRESPONSE']._serialized_end=751
+  _globals['_STREAMACCOUNTSREQUEST']._serialized_start=753
+  _globals['_STREAMACCOUNTSREQUEST']._serialized_end=836
+  _globals['_ACCOUNTDETAIL']._serialized_start=839
+  _globals['_ACCOUNTDETAIL']._serialized_end=984
+  _globals['_GETACCOUNTDETAILREQUEST']._serialized_start=986
+  _globals['_GETACCOUNTDETAILREQUEST']._serialized_end=1035
+  _globals['_GETACCOUNTDETAILSBATCHREQUEST']._serialized_start=1037
+  _globals['_GETACCOUNTDETAILSBATCHREQUEST']._serialized_end=1093
+  _globals['_ACCOUNTDETAILRESULT']._serialized_start=1095
+  _globals['_ACCOUNTDETAILRESULT']._serialized_end=1164
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE']._serialized_start=1167
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE']._serialized_end=1335
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE_ACCOUNTSENTRY']._serialized_start=1266
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE_ACCOUNTSENTRY']._serialized_end=1335
+  _globals['_UPDATEBALANCEREQUEST']._serialized_start=1337
+  _globals['_UPDATEBALANCEREQUEST']._serialized_end=1404
+  _globals['_UPDATEBALANCERESPONSE']._serialized_start=1406
+  _globals['_UPDATEBALANCERESPONSE']._serialized_end=1446
+  _globals['_ADJUSTBALANCEREQUEST']._serialized_start=1448
+  _globals['_ADJUSTBALANCEREQUEST']._serialized_end=1561
+  _globals['_ADJUSTBALANCERESPONSE']._serialized_start=1563
+  _globals['_ADJUSTBALANCERESPONSE']._serialized_end=1654
+  _globals['_ACCOUNTCREDIT']._serialized_start=1656
+  _globals['_ACCOUNTCREDIT']._serialized_end=1711
+  _globals['_CREDITACCOUNTSBATCHREQUEST']._serialized_start=1713
+  _globals['_CREDITACCOUNTSBATCHREQUEST']._serialized_end=1774
+  _globals['_CREDITACCOUNTSBATCHRESPONSE']._serialized_start=1777
+  _globals['_CREDITACCOUNTSBATCHRESPONSE']._serialized_end=1917
+  _globals['_CREDITACCOUNTSBATCHRESPONSE_CREDITEDENTRY']._serialized_start=1870
+  _globals['_CREDITACCOUNTSBATCHRESPONSE_CREDITEDENTRY']._serialized_end=1917
+  _globals['_GETACCOUNTBYEMAILREQUEST']._serialized_start=1919
+  _globals['_GETACCOUNTBYEMAILREQUEST']._serialized_end=1985
+  _globals['_GETACCOUNTBYEMAILRESPONSE']._serialized_start=1988
+  _globals['_GETACCOUNTBYEMAILRESPONSE']._serialized_end=2160
+  _globals['_ACCOUNTDETAILSSERVICE']._serialized_start=2163
+  _globals['_ACCOUNTDETAILSSERVICE']._serialized_end=2884
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,290 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Hot/cold tiering of bank.transactions.
+
+The archive job moves ledger rows older than a cutoff into zstd Parquet
+files under ARCHIVE_DIR, partitioned by month and account hash:
+
+    <dir>/month=2025-01/bucket=007/part-<run>.parquet
+
+A row is stored in its sender's bucket, and again (copy=true) in its
+receiver's bucket if that differs, so one account's rows for a month are
+in one directory. The split point is archive_state.archived_before: rows
+before it are read from the files, rows from it on from MongoDB. It is
+committed after the files are in place and before the hot rows are
+deleted, so a crash at any point leaves no row missing or doubled. Every
+transactions replica needs the same directory (e.g. a shared volume).
+
+    python archive.py                       # archive rows older than ARCHIVE_AFTER_DAYS
+    python archive.py --older-than-days 90
+"""
+
+import argparse
+import datetime
+import glob
+import heapq
+import logging
+import os
+import zlib
+
+from bson.objectid import ObjectId
+from pymongo.mongo_client import MongoClient
+
+from daily_stats import day_of
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Archiving and cold reads are unavailable without pyarrow
+    pa = None
+    pq = None
+
+STATE_COLLECTION = "archive_state"
+STATE_ID = "transactions"
+RUN_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def archive_schema():
+    return pa.schema([
+        ("transaction_id", pa.string()),
+        ("sender", pa.string()),
+        ("receiver", pa.string()),
+        ("amount", pa.float64()),
+        ("reason", pa.string()),
+        ("time_stamp", pa.timestamp("us")),
+        ("copy", pa.bool_()),
+    ])
+
+
+def bucket_of(account_number, buckets):
+    return zlib.crc32(account_number.encode()) % buckets
+
+
+def month_start(time_stamp):
+    return datetime.datetime(time_stamp.year, time_stamp.month, 1)
+
+
+def next_month(month):
+    return datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_dir(directory, month, bucket):
+    return os.path.join(directory, f"month={month:%Y-%m}", f"bucket={bucket:03d}")
+
+
+def get_state(db):
+    """The committed archive state ({archived_before, buckets}) or None."""
+    doc = db[STATE_COLLECTION].find_one({"_id": STATE_ID})
+    return doc if doc and doc.get("archived_before") else None
+
+
+def _delete_hot(transactions, before):
+    deleted = transactions.delete_many({"time_stamp": {"$lt": before}}).deleted_count
+    if deleted:
+        logging.debug(f"Deleted {deleted} archived rows before {before} from the hot collection")
+
+
+def _remove_uncommitted(directory, run):
+    # Part files of runs that never committed; committed runs started
+    # before the current archived_before, so their names sort lower
+    for path in glob.glob(os.path.join(directory, "month=*", "bucket=*", "part-*.parquet*")):
+        if os.path.basename(path)[len("part-"):].split(".")[0] >= run:
+            os.remove(path)
+
+
+def _archive_range(transactions, directory, month, start, end, buckets, run, batch_size):
+    schema = archive_schema()
+    writers = {}
+    pending = {}
+
+    def flush(bucket):
+        if bucket not in writers:
+            path = os.path.join(partition_dir(directory, month, bucket), f"part-{run}.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writers[bucket] = (path, pq.ParquetWriter(f"{path}.tmp", schema, compression="zstd"))
+        writers[bucket][1].write_table(pa.Table.from_pylist(pending.pop(bucket), schema=schema))
+
+    def add(bucket, row):
+        pending.setdefault(bucket, []).append(row)
+        if len(pending[bucket]) == batch_size:
+            flush(bucket)
+
+    rows = 0
+    try:
+        cursor = transactions.find({"time_stamp": {"$gte": start, "$lt": end}}, batch_size=batch_size)
+        with cursor.sort([("time_stamp", 1), ("_id", 1)]):
+            for t in cursor:
+                row = {
+                    "transaction_id": str(t["_id"]),
+                    "sender": t["sender"],
+                    "receiver": t["receiver"],
+                    "amount": t["amount"],
+                    "reason": t.get("reason", ""),
+                    "time_stamp": t["time_stamp"],
+                    "copy": False,
+                }
+                sender_bucket = bucket_of(t["sender"], buckets)
+                receiver_bucket = bucket_of(t["receiver"], buckets)
+                add(sender_bucket, row)
+                if receiver_bucket != sender_bucket:
+                    add(receiver_bucket, {**row, "copy": True})
+                rows += 1
+        for bucket in list(pending):
+            flush(bucket)
+    finally:
+        for path, writer in writers.values():
+            writer.close()
+    for path, _ in writers.values():
+        os.replace(f"{path}.tmp", path)
+    return rows
+
+
+def archive(db, directory, older_than_days, buckets=16, batch_size=5000):
+    """Move rows older than older_than_days (whole days) into the cold
+    partitions. Returns the number of rows archived."""
+    if pa is None:
+        raise RuntimeError("Archiving requires pyarrow, which is not installed")
+    transactions = db["transactions"]
+    state = get_state(db)
+    if state:
+        # Finish a run that committed but stopped before deleting
+        _delete_hot(transactions, state["archived_before"])
+        buckets = state["buckets"]
+        start = state["archived_before"]
+    else:
+        oldest = transactions.find_one({}, {"time_stamp": 1}, sort=[("time_stamp", 1)])
+        if oldest is None:
+            return 0
+        start = oldest["time_stamp"]
+
+    cutoff = day_of(datetime.datetime.now()) - datetime.timedelta(days=older_than_days)
+    if cutoff <= start:
+        logging.debug(f"Nothing to archive before {cutoff}")
+        return 0
+
+    # Named after the range start, so a rerun after a crash replaces the
+    # files of the failed attempt
+    run = start.strftime(RUN_FORMAT)
+    _remove_uncommitted(directory, run)
+    rows = 0
+    month = month_start(start)
+    while month < cutoff:
+        rows += _archive_range(
+            transactions, directory, month, max(start, month), min(next_month(month), cutoff),
+            buckets, run, batch_size,
+        )
+        month = next_month(month)
+
+    db[STATE_COLLECTION].update_one(
+        {"_id": STATE_ID},
+        {"$set": {"archived_before": cutoff, "buckets": buckets, "updated_at": datetime.datetime.now()}},
+        upsert=True,
+    )
+    _delete_hot(transactions, cutoff)
+    logging.debug(f"Archived {rows} transactions before {cutoff}")
+    return rows
+
+
+class ColdStore:
+    """Reads archived rows back as ledger documents (same fields as in
+    MongoDB), ordered by (time_stamp, _id)."""
+
+    def __init__(self, directory):
+        if pa is None:
+            raise RuntimeError("Reading the transaction archive requires pyarrow, which is not installed")
+        self.directory = directory
+
+    def _months(self, start, end):
+        months = []
+        for path in glob.glob(os.path.join(self.directory, "month=*")):
+            month = datetime.datetime.strptime(os.path.basename(path)[len("month="):], "%Y-%m")
+            if (start is None or next_month(month) > start) and month < end:
+                months.append(month)
+        return sorted(months)
+
+    @staticmethod
+    def _iter_file(path, start, end, descending):
+        parquet_file = pq.ParquetFile(path)
+        time_stamp_column = parquet_file.schema_arrow.get_field_index("time_stamp")
+        groups = range(parquet_file.num_row_groups)
+        for i in reversed(groups) if descending else groups:
+            # Skip row groups outside the range using their statistics
+            statistics = parquet_file.metadata.row_group(i).column(time_stamp_column).statistics
+            if statistics is not None and statistics.has_min_max:
+                if (start is not None and statistics.max < start) or statistics.min >= end:
+                    continue
+            rows = parquet_file.read_row_group(i).to_pylist()
+            yield from reversed(rows) if descending else rows
+
+    def iter_rows(self, state, account_number=None, start=None, end=None, after=None, descending=False):
+        """Archived rows with start <= time_stamp < end (either may be None)
+        and, if after=(time_stamp, _id) is given, below that key. Reads no
+        files when the range starts at or after archived_before."""
+        end = min(end, state["archived_before"]) if end else state["archived_before"]
+        if after is not None:
+            end = min(end, after[0] + datetime.timedelta(microseconds=1))
+        if start is not None and start >= end:
+            return
+        after_key = (after[0], str(after[1])) if after is not None else None
+
+        months = self._months(start, end)
+        for month in reversed(months) if descending else months:
+            if account_number:
+                directories = [partition_dir(self.directory, month, bucket_of(account_number, state["buckets"]))]
+            else:
+                directories = sorted(glob.glob(os.path.join(self.directory, f"month={month:%Y-%m}", "bucket=*")))
+
+            # Part files of one bucket hold consecutive ranges; buckets
+            # interleave in time, so they are merged
+            streams = []
+            for directory in directories:
+                paths = sorted(glob.glob(os.path.join(directory, "part-*.parquet")), reverse=descending)
+                streams.append(
+                    row for path in paths for row in self._iter_file(path, start, end, descending)
+                )
+            key = lambda row: (row["time_stamp"], row["transaction_id"])
+            for row in heapq.merge(*streams, key=key, reverse=descending):
+                if start is not None and row["time_stamp"] < start:
+                    continue
+                if row["time_stamp"] >= end:
+                    continue
+                if after_key is not None and key(row) >= after_key:
+                    continue
+                if account_number:
+                    if account_number not in (row["sender"], row["receiver"]):
+                        continue
+                elif row["copy"]:
+                    continue
+                yield {
+                    "_id": ObjectId(row["transaction_id"]),
+                    "sender": row["sender"],
+                    "receiver": row["receiver"],
+                    "amount": row["amount"],
+                    "reason": row["reason"],
+                    "time_stamp": row["time_stamp"],
+                }
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    logging.basicConfig(level=logging.DEBUG)
+    logging.getLogger('pymongo').setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Move old transactions into the Parquet archive")
+    parser.add_argument("--dir", default=os.getenv("ARCHIVE_DIR"), help="archive directory (ARCHIVE_DIR)")
+    parser.add_argument("--older-than-days", type=int, default=int(os.getenv("ARCHIVE_AFTER_DAYS", "365")))
+    parser.add_argument("--buckets", type=int, default=int(os.getenv("ARCHIVE_BUCKETS", "16")),
+                        help="account hash buckets; fixed by the first run")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise Exception("DB_URL environment variable is not set")
+    if not args.dir:
+        raise Exception("ARCHIVE_DIR environment variable is not set")
+    archive(MongoClient(db_url)["bank"], args.dir, args.older_than_days, args.buckets, args.batch_size)
@@ -0,0 +1,136 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Planning for batch transfers, shared by both transfer engines.
+
+A batch is a list of transfer requests (sender_account_number,
+receiver_account_number, amount, reason). plan_batch decides which items
+can be applied against a snapshot of the involved accounts; the engines
+then apply one debit per sender, one bulk credit and one ledger insert.
+"""
+
+import math
+
+SUCCESS_MESSAGE = "Transaction is Successful."
+BATCH_REJECTED_MESSAGE = "Batch rejected: another transfer in the batch failed."
+# A balance change or commit whose request failed in transit may still have
+# been applied; such transfers keep their idempotency key and need reconciliation
+OUTCOME_UNKNOWN_MESSAGE = "Transfer outcome unknown, please check the account before retrying."
+
+
+def parse_amount(amount):
+    """Return amount as a positive finite float, or None if it is not one."""
+    if isinstance(amount, bool):
+        return None
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(amount) or amount <= 0:
+        return None
+    return amount
+
+
+def invalid_transfer(sender, receiver, amount):
+    """Message rejecting a malformed transfer, or None. amount is the
+    result of parse_amount."""
+    if not sender or not receiver:
+        return "Sender and receiver account numbers are required."
+    if sender == receiver:
+        return "Sender and receiver must differ."
+    if amount is None:
+        return "Amount must be a positive number."
+    return None
+
+
+def batch_account_numbers(transfers):
+    account_numbers = set()
+    for t in transfers:
+        for account_number in (t.sender_account_number, t.receiver_account_number):
+            if isinstance(account_number, str) and account_number:
+                account_numbers.add(account_number)
+    return sorted(account_numbers)
+
+
+def plan_batch(transfers, accounts, all_or_nothing):
+    """Validate a batch against accounts ({account_number: {"balance": ...}}).
+
+    Items are accepted in order while each sender's running balance covers
+    them. Returns (results, accepted): one {"index", "approved", "message"}
+    per item, and the accepted item indexes. With all_or_nothing, any
+    failed item rejects the whole batch and accepted is empty.
+    """
+    results = []
+    accepted = []
+    remaining = {}
+
+    for index, t in enumerate(transfers):
+        result = {"index": index, "approved": False, "message": ""}
+        results.append(result)
+        sender = t.sender_account_number
+        receiver = t.receiver_account_number
+        amount = parse_amount(t.amount)
+
+        invalid = invalid_transfer(sender, receiver, amount)
+        if invalid:
+            result["message"] = invalid
+        elif sender not in accounts:
+            result["message"] = "Sender Account Not Found."
+        elif receiver not in accounts:
+            result["message"] = "Receiver Account Not Found."
+        else:
+            balance = remaining.get(sender, accounts[sender]["balance"])
+            if balance < amount:
+                result["message"] = "Insufficient Balance"
+            else:
+                remaining[sender] = balance - amount
+                result["approved"] = True
+                result["message"] = SUCCESS_MESSAGE
+                accepted.append(index)
+
+    if all_or_nothing and len(accepted) < len(transfers):
+        reject_items(results, accepted, BATCH_REJECTED_MESSAGE)
+        accepted = []
+
+    return results, accepted
+
+
+def reject_items(results, indexes, message):
+    for index in indexes:
+        results[index]["approved"] = False
+        results[index]["message"] = message
+
+
+def aggregate_batch(transfers, accepted):
+    """Total debit per sender and total credit per receiver of the accepted items."""
+    debits = {}
+    credits = {}
+    for index in accepted:
+        t = transfers[index]
+        amount = parse_amount(t.amount)
+        debits[t.sender_account_number] = debits.get(t.sender_account_number, 0) + amount
+        credits[t.receiver_account_number] = credits.get(t.receiver_account_number, 0) + amount
+    return debits, credits
+
+
+def ledger_rows(transfers, accepted, time_stamp):
+    return [
+        {
+            "sender": transfers[index].sender_account_number,
+            "receiver": transfers[index].receiver_account_number,
+            "amount": parse_amount(transfers[index].amount),
+            "reason": transfers[index].reason or "",
+            "time_stamp": time_stamp,
+        }
+        for index in accepted
+    ]
+
+
+def batch_response(results):
+    approved = sum(1 for result in results if result["approved"])
+    return {
+        "approved": approved == len(results),
+        "message": f"{approved} of {len(results)} transfers succeeded.",
+        "results": results,
+    }
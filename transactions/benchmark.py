@@ -0,0 +1,118 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Benchmarks for the transactions service.
+
+Run against live transactions services and their MongoDB, e.g.:
+
+    python benchmark.py transfer-engine \
+        --target http=http://localhost:50052 --target db=http://localhost:50062
+"""
+
+import argparse
+from concurrent import futures
+import os
+import random
+import statistics
+import time
+
+import requests
+from dotenv import load_dotenv
+from pymongo.mongo_client import MongoClient
+
+load_dotenv()
+
+
+def report(label, samples, elapsed, rejected=0):
+    # samples are the latencies of approved transfers only
+    print(f"{label:<28} {len(samples) / elapsed:10.1f} approved/s  {rejected:6d} rejected", end="")
+    if not samples:
+        print()
+        return
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"  p50 {statistics.median(samples) * 1000:9.3f} ms"
+        f"  p99 {p99 * 1000:9.3f} ms"
+    )
+
+
+def get_db():
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise Exception("DB_URL environment variable is not set")
+    return MongoClient(db_url)["bank"]
+
+
+def sample_account_numbers(size):
+    accounts = get_db()["accounts"].aggregate(
+        [{"$sample": {"size": size}}, {"$project": {"_id": 0, "account_number": 1}}]
+    )
+    return [account["account_number"] for account in accounts]
+
+
+def run_transfers(url, concurrency, transfers_per_client, account_numbers):
+    def client(_):
+        session = requests.Session()
+        latencies = []
+        rejected = 0
+        for _ in range(transfers_per_client):
+            sender, receiver = random.sample(account_numbers, 2)
+            start = time.perf_counter()
+            response = session.post(
+                f"{url}/transfer",
+                json={
+                    "sender_account_number": sender,
+                    "receiver_account_number": receiver,
+                    "amount": 0.01,
+                    "reason": "benchmark",
+                },
+            )
+            latency = time.perf_counter() - start
+            # Rejections (insufficient balance, busy accounts, errors) are
+            # counted apart so they do not pass for throughput
+            if response.ok and response.json().get("approved"):
+                latencies.append(latency)
+            else:
+                rejected += 1
+        return latencies, rejected
+
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return latencies, sum(rejected for _, rejected in results), elapsed
+
+
+def bench_transfer_engine(args):
+    # Start one transactions service per engine (TRANSFER_ENGINE=http / db)
+    # and pass each as a labelled target. A small account pool keeps
+    # contention on the same documents high.
+    account_numbers = sample_account_numbers(args.accounts)
+    targets = [target.split("=", 1) for target in args.target]
+    print(f"{len(account_numbers)} accounts, {args.transfers} transfers per client")
+    for label, url in targets:
+        for concurrency in args.concurrency:
+            latencies, rejected, elapsed = run_transfers(url, concurrency, args.transfers, account_numbers)
+            report(f"{label} x {concurrency} clients", latencies, elapsed, rejected)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transactions service benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    engine_parser = subparsers.add_parser(
+        "transfer-engine", help="transfer latency and throughput per transfer engine"
+    )
+    engine_parser.add_argument(
+        "--target", action="append", required=True, help="label=http://host:port, repeatable"
+    )
+    engine_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    engine_parser.add_argument("--transfers", type=int, default=50)
+    engine_parser.add_argument("--accounts", type=int, default=20)
+    engine_parser.set_defaults(func=bench_transfer_engine)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,176 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Per-account daily transaction aggregates in bank.transaction_daily_stats.
+
+Every ledger write also $inc-upserts one document per (account_number, day)
+holding credit/debit amounts and counts, so summaries over any date range
+read at most one document per day instead of the raw ledger. The update
+follows the ledger insert and is not atomic with it outside the db
+transfer engine; if the two drift, rebuild from the ledger:
+
+    python daily_stats.py --rebuild                 # every account
+    python daily_stats.py --rebuild --account IBAN… # one account
+"""
+
+import argparse
+import datetime
+import logging
+import os
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.mongo_client import MongoClient
+
+STATS_COLLECTION = "transaction_daily_stats"
+FIELDS = ("credit_amount", "credit_count", "debit_amount", "debit_count")
+
+
+def day_of(time_stamp):
+    return datetime.datetime(time_stamp.year, time_stamp.month, time_stamp.day)
+
+
+def stats_updates(rows):
+    """One $inc upsert per (account_number, day) touched by the ledger rows."""
+    totals = {}
+    for row in rows:
+        day = day_of(row["time_stamp"])
+        for account_number, side in ((row["sender"], "debit"), (row["receiver"], "credit")):
+            total = totals.setdefault((account_number, day), dict.fromkeys(FIELDS, 0))
+            total[f"{side}_amount"] += row["amount"]
+            total[f"{side}_count"] += 1
+    return [
+        UpdateOne(
+            {"account_number": account_number, "day": day},
+            {"$inc": total},
+            upsert=True,
+        )
+        for (account_number, day), total in totals.items()
+    ]
+
+
+def record(collection, rows, session=None):
+    updates = stats_updates(rows)
+    if updates:
+        collection.bulk_write(updates, ordered=False, session=session)
+
+
+def parse_day(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date, expected YYYY-MM-DD: {value}")
+
+
+def summarize(collection, account_number, start_day, end_day, granularity="day"):
+    """Buckets for start_day..end_day inclusive, plus the range total.
+
+    Raises ValueError for an unknown granularity or an inverted range.
+    """
+    if granularity not in ("day", "month"):
+        raise ValueError(f"Invalid granularity, expected day or month: {granularity}")
+    if end_day < start_day:
+        raise ValueError("end_date is before start_date")
+
+    buckets = {}
+    total = dict.fromkeys(FIELDS, 0)
+    docs = collection.find(
+        {
+            "account_number": account_number,
+            "day": {"$gte": start_day, "$lt": end_day + datetime.timedelta(days=1)},
+        },
+        {"_id": 0, "day": 1, **{field: 1 for field in FIELDS}},
+    ).sort("day", 1)
+    for doc in docs:
+        period = doc["day"].strftime("%Y-%m-%d" if granularity == "day" else "%Y-%m")
+        bucket = buckets.setdefault(period, {"period": period, **dict.fromkeys(FIELDS, 0)})
+        for field in FIELDS:
+            bucket[field] += doc.get(field, 0)
+            total[field] += doc.get(field, 0)
+
+    return {"buckets": list(buckets.values()), "total": {"period": "total", **total}}
+
+
+def rebuild(db, account_number=None, since=None):
+    """Recompute the aggregates from the raw ledger. Returns the number of
+    stats documents written. With since (a day), only days from it on are
+    rebuilt, e.g. the ones still in the hot collection when archiving.
+
+    Documents are replaced in place and stale ones deleted afterwards, so
+    summaries keep working during a rebuild. Rows written while it runs may
+    be counted twice or not at all; rebuild when traffic is low.
+    """
+    stats = db[STATS_COLLECTION]
+    rebuilt_at = datetime.datetime.now()
+    match = {}
+    if account_number:
+        match["$or"] = [{"sender": account_number}, {"receiver": account_number}]
+    if since:
+        match["time_stamp"] = {"$gte": since}
+    pipeline = [{"$match": match}] if match else []
+    pipeline += [
+        {
+            "$project": {
+                "amount": 1,
+                "day": {"$dateTrunc": {"date": "$time_stamp", "unit": "day"}},
+                "sides": [
+                    {"account_number": "$sender", "side": "debit"},
+                    {"account_number": "$receiver", "side": "credit"},
+                ],
+            }
+        },
+        {"$unwind": "$sides"},
+        {"$group": {
+            "_id": {"account_number": "$sides.account_number", "day": "$day"},
+            "credit_amount": {"$sum": {"$cond": [{"$eq": ["$sides.side", "credit"]}, "$amount", 0]}},
+            "credit_count": {"$sum": {"$cond": [{"$eq": ["$sides.side", "credit"]}, 1, 0]}},
+            "debit_amount": {"$sum": {"$cond": [{"$eq": ["$sides.side", "debit"]}, "$amount", 0]}},
+            "debit_count": {"$sum": {"$cond": [{"$eq": ["$sides.side", "debit"]}, 1, 0]}},
+        }},
+    ]
+    scope = {}
+    if account_number:
+        # The match above also pulls in the counterparties' rows
+        pipeline.append({"$match": {"_id.account_number": account_number}})
+        scope["account_number"] = account_number
+    if since:
+        scope["day"] = {"$gte": since}
+
+    written = 0
+    batch = []
+    for doc in db["transactions"].aggregate(pipeline, allowDiskUse=True):
+        key = doc.pop("_id")
+        batch.append(ReplaceOne(key, {**key, **doc, "rebuilt_at": rebuilt_at}, upsert=True))
+        if len(batch) == 1000:
+            written += len(batch)
+            stats.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        written += len(batch)
+        stats.bulk_write(batch, ordered=False)
+    stats.delete_many({**scope, "rebuilt_at": {"$ne": rebuilt_at}})
+    logging.debug(f"Rebuilt {written} daily stats documents")
+    return written
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    logging.basicConfig(level=logging.DEBUG)
+    logging.getLogger('pymongo').setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Manage per-account daily transaction aggregates")
+    parser.add_argument("--rebuild", action="store_true", required=True,
+                        help="recompute the aggregates from the ledger")
+    parser.add_argument("--account", help="only rebuild this account number")
+    args = parser.parse_args()
+
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise Exception("DB_URL environment variable is not set")
+    db = MongoClient(db_url)["bank"]
+    # Archived rows are no longer in the ledger collection; keep their days
+    from archive import get_state
+    state = get_state(db)
+    rebuild(db, args.account, state["archived_before"] if state else None)
@@ -0,0 +1,253 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Streaming export of ledger rows as NDJSON, CSV or Parquet.
+
+Rows come from one Mongo cursor in time order and are encoded batch by
+batch, so memory stays bounded by batch_size whatever the export size.
+Parquet needs pyarrow and writes one row group per batch. From the shell:
+
+    python export.py --account IBAN… --format csv --output ledger.csv
+    python export.py --start-date 2026-01-01 --end-date 2026-01-31 \\
+        --format parquet --output january.parquet
+"""
+
+import argparse
+import csv
+import datetime
+import io
+import itertools
+import json
+import logging
+import os
+
+from pymongo.mongo_client import MongoClient
+
+from daily_stats import parse_day
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is unavailable without pyarrow
+    pa = None
+    pq = None
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNS = ("transaction_id", "sender", "receiver", "amount", "reason", "time_stamp")
+
+
+def parquet_schema():
+    return pa.schema([
+        ("transaction_id", pa.string()),
+        ("sender", pa.string()),
+        ("receiver", pa.string()),
+        ("amount", pa.float64()),
+        ("reason", pa.string()),
+        ("time_stamp", pa.timestamp("us")),
+    ])
+
+
+def check_format(fmt):
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Invalid format, expected one of {', '.join(MEDIA_TYPES)}: {fmt}")
+    if fmt == "parquet" and pa is None:
+        raise ValueError("Parquet export requires pyarrow, which is not installed")
+
+
+def export_range(start_date=None, end_date=None):
+    """(start, end) datetimes for an inclusive YYYY-MM-DD range, end
+    exclusive; either may be None. Raises ValueError for malformed dates."""
+    start = parse_day(start_date) if start_date else None
+    end = parse_day(end_date) + datetime.timedelta(days=1) if end_date else None
+    return start, end
+
+
+def export_query(account_number=None, start=None, end=None):
+    """Ledger filter for an account and/or a time range (see export_range)."""
+    query = {}
+    if account_number:
+        query["$or"] = [{"sender": account_number}, {"receiver": account_number}]
+    time_range = {}
+    if start:
+        time_range["$gte"] = start
+    if end:
+        time_range["$lt"] = end
+    if time_range:
+        query["time_stamp"] = time_range
+    return query
+
+
+def to_export_row(t):
+    return {
+        "transaction_id": str(t["_id"]),
+        "sender": t["sender"],
+        "receiver": t["receiver"],
+        "amount": t["amount"],
+        "reason": t.get("reason", ""),
+        "time_stamp": t["time_stamp"],
+    }
+
+
+def export_batches(collection, query, batch_size=5000, cold=()):
+    """Lists of at most batch_size export rows, oldest first. cold yields
+    ledger rows that all precede the query's (archived rows)."""
+    cursor = collection.find(query, batch_size=batch_size)
+    with cursor.sort([("time_stamp", 1), ("_id", 1)]):
+        batch = []
+        for t in itertools.chain(cold, cursor):
+            batch.append(to_export_row(t))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what was written since the
+    last take(), so ParquetWriter output can be streamed."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _encode_ndjson(batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps({**row, "time_stamp": row["time_stamp"].isoformat()}) + "\n" for row in batch
+        ).encode()
+
+
+def _encode_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows({**row, "time_stamp": row["time_stamp"].isoformat()} for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _encode_parquet(batches):
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv, "parquet": _encode_parquet}
+
+
+def iter_export(collection, query, fmt, batch_size=5000, cold=()):
+    """Generator of encoded chunks, one per batch. The format is checked
+    before the first chunk, so ValueError is raised here, not mid-stream.
+    Closing the generator closes the cursor."""
+    check_format(fmt)
+
+    def generate():
+        batches = export_batches(collection, query, batch_size, cold)
+        try:
+            yield from ENCODERS[fmt](batches)
+        finally:
+            batches.close()
+
+    return generate()
+
+
+def write_export(collection, query, fmt, path, batch_size=5000, cold=()):
+    """Write an export to path, replacing it only once complete. Returns
+    the number of rows written."""
+    check_format(fmt)
+    rows = 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    partial = f"{path}.partial"
+    batches = export_batches(collection, query, batch_size, cold)
+    try:
+        with open(partial, "wb") as f:
+            for chunk in ENCODERS[fmt](counted(batches)):
+                f.write(chunk)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        batches.close()
+    logging.debug(f"Exported {rows} transactions to {path}")
+    return rows
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    logging.basicConfig(level=logging.DEBUG)
+    logging.getLogger('pymongo').setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Export ledger rows as NDJSON, CSV or Parquet")
+    parser.add_argument("--account", help="only transactions of this account number")
+    parser.add_argument("--start-date", help="first day, YYYY-MM-DD")
+    parser.add_argument("--end-date", help="last day, YYYY-MM-DD (inclusive)")
+    parser.add_argument("--format", choices=sorted(MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--output", required=True, help="file to write")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise Exception("DB_URL environment variable is not set")
+    db = MongoClient(db_url)["bank"]
+    start, end = export_range(args.start_date, args.end_date)
+    query = export_query(args.account, start, end)
+    cold = ()
+    # Include archived rows when the archive is configured
+    archive_dir = os.getenv("ARCHIVE_DIR")
+    if archive_dir:
+        from archive import ColdStore, get_state
+        state = get_state(db)
+        if state:
+            query = {"$and": [query, {"time_stamp": {"$gte": state["archived_before"]}}]}
+            cold = ColdStore(archive_dir).iter_rows(state, args.account, start, end)
+    write_export(db["transactions"], query, args.format, args.output, args.batch_size, cold)
@@ -0,0 +1,83 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+import hashlib
+import json
+import logging
+import time
+
+from pymongo.errors import DuplicateKeyError
+
+PENDING = "pending"
+DONE = "done"
+
+
+def request_fingerprint(operation, *fields):
+    return hashlib.sha256(json.dumps([operation, *fields]).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Remembers the outcome of keyed requests so duplicates are not re-applied.
+
+    The first request with a key claims it by inserting a pending document
+    (the key is the _id); duplicates wait up to wait_seconds for that outcome
+    and then return it. Keys expire after ttl seconds through the TTL index
+    on expires_at (see indexes.py). Reusing a key for a different request is
+    rejected. Outcomes listed in release_messages moved no money, so their
+    key is released and a retry runs the request again; so is an exception
+    from apply, which therefore must not raise once money has moved.
+    """
+
+    def __init__(self, collection, ttl=86400, wait_seconds=5.0, release_messages=()):
+        self.collection = collection
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self.release_messages = set(release_messages)
+
+    def run(self, key, fingerprint, apply):
+        if not key:
+            return apply()
+
+        now = datetime.datetime.now()
+        try:
+            self.collection.insert_one(
+                {
+                    "_id": key,
+                    "fingerprint": fingerprint,
+                    "status": PENDING,
+                    "created_at": now,
+                    "expires_at": now + datetime.timedelta(seconds=self.ttl),
+                }
+            )
+        except DuplicateKeyError:
+            return self._duplicate(key, fingerprint, apply)
+
+        try:
+            result = apply()
+        except Exception:
+            self.collection.delete_one({"_id": key, "status": PENDING})
+            raise
+
+        if result.get("message") in self.release_messages:
+            self.collection.delete_one({"_id": key, "status": PENDING})
+        else:
+            self.collection.update_one({"_id": key}, {"$set": {"status": DONE, "result": result}})
+        return result
+
+    def _duplicate(self, key, fingerprint, apply):
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            doc = self.collection.find_one({"_id": key})
+            if doc is None:
+                # Released or expired since our insert failed; claim it again
+                return self.run(key, fingerprint, apply)
+            if doc["fingerprint"] != fingerprint:
+                return {"approved": False, "message": "Idempotency key reused for a different request."}
+            if doc["status"] == DONE:
+                logging.debug(f"Returning stored outcome for idempotency key {key}")
+                return doc["result"]
+            if time.monotonic() >= deadline:
+                return {"approved": False, "message": "A request with this idempotency key is in progress."}
+            time.sleep(0.05)
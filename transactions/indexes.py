@@ -0,0 +1,105 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Versioned index management for the collections owned by the transactions service.
+
+Runs at service startup (see transaction.py) or as a one-off:
+
+    python indexes.py           # apply pending index migrations
+    python indexes.py --check   # explain() the hot queries, exit 1 on COLLSCAN
+                                # or on duplicates blocking a pending unique index
+"""
+
+import datetime
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from migrations import IndexMigrations
+
+SERVICE_NAME = "transactions"
+
+# Append-only list of (version, collection, indexes to create, index names to
+# drop). Never edit an applied entry; add a new version instead.
+MIGRATIONS = [
+    (
+        1,
+        "transactions",
+        [
+            IndexModel(
+                [("sender", ASCENDING), ("time_stamp", DESCENDING)],
+                name="sender_time_stamp",
+            ),
+            IndexModel(
+                [("receiver", ASCENDING), ("time_stamp", DESCENDING)],
+                name="receiver_time_stamp",
+            ),
+        ],
+        [],
+    ),
+    (
+        # History pages sort on (time_stamp, _id) for a stable keyset cursor
+        2,
+        "transactions",
+        [
+            IndexModel(
+                [("sender", ASCENDING), ("time_stamp", DESCENDING), ("_id", DESCENDING)],
+                name="sender_time_stamp_id",
+            ),
+            IndexModel(
+                [("receiver", ASCENDING), ("time_stamp", DESCENDING), ("_id", DESCENDING)],
+                name="receiver_time_stamp_id",
+            ),
+        ],
+        ["sender_time_stamp", "receiver_time_stamp"],
+    ),
+    (
+        # Idempotency keys are looked up by _id; each document carries its
+        # own expiry, so the TTL itself is configured at runtime
+        3,
+        "idempotency_keys",
+        [IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)],
+        [],
+    ),
+    (
+        # One aggregate document per account and day, see daily_stats.py
+        4,
+        "transaction_daily_stats",
+        [
+            IndexModel(
+                [("account_number", ASCENDING), ("day", ASCENDING)],
+                name="account_number_day_unique",
+                unique=True,
+            ),
+        ],
+        [],
+    ),
+    (
+        # Date-range exports scan the ledger in (time_stamp, _id) order
+        5,
+        "transactions",
+        [IndexModel([("time_stamp", ASCENDING), ("_id", ASCENDING)], name="time_stamp_id")],
+        [],
+    ),
+]
+
+# Queries issued on the request path; each must be served by an index.
+HOT_QUERIES = [
+    ("transactions", {"sender": "IBAN0000000000000000"}),
+    ("transactions", {"receiver": "IBAN0000000000000000"}),
+    (
+        "transactions",
+        {"$or": [{"sender": "IBAN0000000000000000"}, {"receiver": "IBAN0000000000000000"}]},
+    ),
+    ("transaction_daily_stats", {"account_number": "IBAN0000000000000000"}),
+    ("transactions", {"time_stamp": {"$gte": datetime.datetime(2000, 1, 1)}}),
+]
+
+
+migrations = IndexMigrations(SERVICE_NAME, MIGRATIONS, HOT_QUERIES)
+ensure_indexes = migrations.ensure_indexes
+check_indexes = migrations.check_indexes
+
+
+if __name__ == "__main__":
+    migrations.main()
@@ -0,0 +1,125 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+from concurrent.futures import Future
+import logging
+import os
+import queue
+import threading
+import time
+
+CONFIRM = "confirm"
+ASYNC = "async"
+
+
+class LedgerWriter:
+    """Group-commit writer for ledger rows.
+
+    Rows are queued and written by one background thread with insert_many,
+    once max_batch rows are waiting or max_delay seconds after the first row
+    of a batch arrived. Each write returns a Future that resolves when its
+    batch commits. In CONFIRM mode write() blocks on that future; in ASYNC
+    mode it returns at once and a failed batch is only logged and counted.
+
+    The thread starts on first use in each process, so the writer can be
+    created before gunicorn forks its workers. after_flush, if given, is
+    called with the rows of every committed batch; its errors are logged
+    and do not fail the writes.
+    """
+
+    def __init__(self, collection, max_batch=500, max_delay=0.002, max_queue=100000, after_flush=None):
+        self.collection = collection
+        self.after_flush = after_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.rows = 0
+        self.failed_rows = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+                self._thread.start()
+
+    def write(self, row, mode=CONFIRM):
+        """Queue a row. Unless mode is ASYNC, blocks until the row is
+        committed and raises if its batch failed."""
+        self._ensure_started()
+        future = Future()
+        # Blocks when the queue is full, pushing back on request threads
+        self._queue.put((row, future))
+        if mode != ASYNC:
+            future.result()
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        rows = [row for row, _ in batch]
+        try:
+            self.collection.insert_many(rows)
+        except Exception as e:
+            logging.error(f"Ledger flush of {len(batch)} rows failed: {e}")
+            with self._lock:
+                self.failed_rows += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.flushes += 1
+            self.rows += len(batch)
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            self.total_flush_seconds += elapsed
+        if self.after_flush is not None:
+            try:
+                self.after_flush(rows)
+            except Exception as e:
+                logging.error(f"after_flush for {len(rows)} ledger rows failed: {e}")
+        for _, future in batch:
+            future.set_result(None)
+
+    def drain(self):
+        """Wait until every queued row has been flushed (e.g. at exit)."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "flushes": self.flushes,
+                "rows": self.rows,
+                "failed_rows": self.failed_rows,
+                "avg_batch_size": self.rows / self.flushes if self.flushes else 0.0,
+                "last_flush_ms": self.last_flush_seconds * 1000,
+                "max_flush_ms": self.max_flush_seconds * 1000,
+                "avg_flush_ms": self.total_flush_seconds * 1000 / self.flushes if self.flushes else 0.0,
+            }
@@ -2,24 +2,56 @@
 # Use of this source code is governed by a BSD-style
 # license that can be found in the LICENSE file.
 
+import atexit
+import itertools
 from concurrent import futures
 import datetime
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
 import os
+import random
+import signal
+import sys
+import time
 import grpc
-from flask import Flask, request, jsonify
+import json
+from flask import Flask, Response, request, jsonify, stream_with_context
 
 from dotmap import DotMap
 
 # Configure the logging settings
 import logging
-import requests
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 from transaction_pb2 import *
 import transaction_pb2_grpc
+from indexes import ensure_indexes
+from serving import serve
+from accounts_client import AccountsClientError, accounts_client_from_env
+from account_resolver import AccountResolver
+from transfer_engine import DbTransferEngine
+from idempotency import IdempotencyStore, request_fingerprint
+from metrics import Counters
+from ledger_writer import LedgerWriter
+from transfer_lanes import LaneBusy, TransferLanes
+from batch_transfer import (
+    BATCH_REJECTED_MESSAGE,
+    OUTCOME_UNKNOWN_MESSAGE,
+    aggregate_batch,
+    batch_account_numbers,
+    batch_response,
+    invalid_transfer,
+    ledger_rows,
+    parse_amount,
+    plan_batch,
+    reject_items,
+)
+from transaction_cache import TransactionCache
+import daily_stats
+import export
+from archive import ColdStore, get_state
 
 from google.protobuf.json_format import MessageToDict
 
@@ -50,39 +82,340 @@ if protocol is None:
 protocol = protocol.lower()
 logging.debug(f"microservice protocol: {protocol}")
 
+# HTTP server: "development" (Flask dev server) or "production" (gunicorn, see serving.py)
+http_server_mode = os.getenv("HTTP_SERVER_MODE", "development").lower()
+logging.debug(f"HTTP server mode: {http_server_mode}")
+
+# Transfer engine: "http" (balance updates through the accounts service) or
+# "db" (one MongoDB multi-document transaction, needs a replica set)
+transfer_engine = os.getenv("TRANSFER_ENGINE", "http").lower()
+logging.debug(f"transfer engine: {transfer_engine}")
+
 client = MongoClient(uri)
 db = client["bank"]
 collection_transactions = db["transactions"]
+collection_daily_stats = db[daily_stats.STATS_COLLECTION]
 
-# Accounts Service URL
-ACCOUNTS_SERVICE_URL = os.getenv("ACCOUNTS_SERVICE_URL")
-if ACCOUNTS_SERVICE_URL is None:
-    raise Exception("ACCOUNTS_SERVICE_URL environment variable is not set")
+# Transactions are immutable, so cached records never go stale
+transaction_cache = TransactionCache(
+    max_bytes=int(os.getenv("TRANSACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    enabled=os.getenv("TRANSACTION_CACHE_ENABLED", "true").lower() == "true",
+)
+logging.debug(f"transaction cache: {transaction_cache.stats()}")
+
+# History page size when the caller sends no limit, and the largest allowed
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "100"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "1000"))
+# Cursor batch size for streamed history, overridable per request
+HISTORY_STREAM_BATCH_SIZE = int(os.getenv("HISTORY_STREAM_BATCH_SIZE", "500"))
+
+# Transfers touching the same account run one at a time in this process
+# (see transfer_lanes.py), so their version checks do not conflict with
+# each other. TRANSFER_LANES=0 disables the lanes. Waiters hold request
+# threads, so each lane queues at most TRANSFER_LANE_MAX_WAITERS of them
+# (0 = no cap) and rejects the rest as busy.
+transfer_lanes = TransferLanes(
+    lanes=int(os.getenv("TRANSFER_LANES", "64")),
+    timeout=float(os.getenv("TRANSFER_LANE_TIMEOUT", "5")),
+    max_waiters=int(os.getenv("TRANSFER_LANE_MAX_WAITERS", "2")),
+)
+LANE_BUSY_MESSAGE = "Account is busy, please retry."
+CAS_BUSY_MESSAGE = "Sender account is busy, please retry."
+ACCOUNTS_UNAVAILABLE_MESSAGE = "Accounts service unavailable, please retry."
+
+# Outcomes of transfers sent with an idempotency key, kept for
+# IDEMPOTENCY_KEY_TTL seconds. Only failures that certainly moved no money
+# release the key so that a retry runs again.
+idempotency = IdempotencyStore(
+    db["idempotency_keys"],
+    ttl=int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400")),
+    wait_seconds=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "5")),
+    release_messages=(
+        "Insufficient Balance",
+        "Sender Account Not Found.",
+        "Receiver Account Not Found.",
+        "Failed to update sender balance.",
+        "Failed to update receiver balance.",
+        LANE_BUSY_MESSAGE,
+        CAS_BUSY_MESSAGE,
+        ACCOUNTS_UNAVAILABLE_MESSAGE,
+    ),
+)
+
+# The sender debit is a compare-and-set on the account version the transfer
+# read; on a conflict it is retried up to TRANSFER_CAS_RETRIES times with
+# jittered exponential backoff starting at TRANSFER_CAS_BACKOFF seconds
+TRANSFER_CAS_RETRIES = int(os.getenv("TRANSFER_CAS_RETRIES", "8"))
+TRANSFER_CAS_BACKOFF = float(os.getenv("TRANSFER_CAS_BACKOFF", "0.005"))
+transfer_metrics = Counters("debit_attempts", "version_conflicts", "retries", "retries_exhausted")
+
+# Exports are encoded EXPORT_BATCH_SIZE rows at a time. Exports written to
+# a local path go to EXPORT_DIR; unset, only downloads are allowed.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+EXPORT_DIR = os.getenv("EXPORT_DIR")
+
+# Rows moved to the Parquet archive by archive.py are read back from
+# ARCHIVE_DIR when a history page or export reaches before the archive
+# cutoff. Unset, nothing is archived and only MongoDB is read.
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR")
+cold_store = ColdStore(ARCHIVE_DIR) if ARCHIVE_DIR else None
+logging.debug(f"archive dir: {ARCHIVE_DIR}")
+
+# The committed archive state, or None when nothing has been archived
+def archiveState():
+    return get_state(db) if cold_store else None
+
+# Restricts a ledger query to the hot rows; archived ones not yet deleted
+# are served from the archive
+def hotQuery(query, state):
+    if state is None:
+        return query
+    return {"$and": [query, {"time_stamp": {"$gte": state["archived_before"]}}]}
+
+# Summaries default to the last SUMMARY_DEFAULT_DAYS days
+SUMMARY_DEFAULT_DAYS = int(os.getenv("SUMMARY_DEFAULT_DAYS", "30"))
+
+# Fold committed ledger rows into the daily aggregates. The money has moved
+# by then, so a failure is only logged; daily_stats.py --rebuild repairs it.
+def recordDailyStats(rows):
+    try:
+        daily_stats.record(collection_daily_stats, rows)
+    except Exception as e:
+        logging.error(f"Daily stats update for {len(rows)} ledger rows failed: {e}")
+
+# Ledger writes: "direct" inserts each row on the request thread; "group"
+# queues rows for LedgerWriter, which commits them with insert_many. Requests
+# pick ledger_mode "confirm" (wait for the commit) or "async" (return once
+# queued), defaulting to LEDGER_DEFAULT_MODE.
+ledger_writes = os.getenv("LEDGER_WRITES", "direct").lower()
+LEDGER_DEFAULT_MODE = os.getenv("LEDGER_DEFAULT_MODE", "confirm").lower()
+logging.debug(f"ledger writes: {ledger_writes}")
+ledger_writer = LedgerWriter(
+    collection_transactions,
+    max_batch=int(os.getenv("LEDGER_MAX_BATCH", "500")),
+    max_delay=float(os.getenv("LEDGER_MAX_DELAY", "0.002")),
+    max_queue=int(os.getenv("LEDGER_MAX_QUEUE", "100000")),
+    after_flush=recordDailyStats,
+)
+# Covers normal exits and gunicorn workers; SIGTERM on the gRPC and Flask
+# development servers is handled in serverGRPC / serverFlask
+atexit.register(ledger_writer.drain)
+# Seconds in-flight RPCs get to finish on SIGTERM
+GRPC_SHUTDOWN_GRACE = float(os.getenv("GRPC_SHUTDOWN_GRACE", "5"))
+
+# Largest number of transfers accepted in one batch
+BATCH_TRANSFER_MAX_ITEMS = int(os.getenv("BATCH_TRANSFER_MAX_ITEMS", "10000"))
+
+# Pooled client for the accounts service, see accounts_client.py; in gRPC
+# mode the hop to accounts is gRPC too
+accounts_client = accounts_client_from_env(default_transport=protocol)
+
+# Zelle resolves emails to account numbers through this cache and reads no
+# balances; unknown emails are remembered for ACCOUNT_RESOLVER_NEGATIVE_TTL
+# seconds, so a new account can take that long to receive Zelle payments
+account_resolver = AccountResolver(
+    accounts_client.get_account_by_email,
+    max_size=int(os.getenv("ACCOUNT_RESOLVER_SIZE", "10000")),
+    ttl=float(os.getenv("ACCOUNT_RESOLVER_TTL", "300")),
+    negative_ttl=float(os.getenv("ACCOUNT_RESOLVER_NEGATIVE_TTL", "5")),
+    enabled=os.getenv("ACCOUNT_RESOLVER_ENABLED", "true").lower() == "true",
+)
+logging.debug(f"account resolver: {account_resolver.stats()}")
+
+# History is ordered newest first by (time_stamp, _id); the keyset cursor is
+# the sort key of the last row of the previous page
+def encodeHistoryCursor(t):
+    return f"{t['time_stamp'].isoformat()}|{t['_id']}"
+
+def decodeHistoryCursor(after):
+    try:
+        time_stamp, transaction_id = after.split("|")
+        return datetime.datetime.fromisoformat(time_stamp), ObjectId(transaction_id)
+    except (ValueError, InvalidId):
+        raise ValueError(f"Invalid history cursor: {after}")
+
+# Raises ValueError for a malformed `after` cursor
+def historyQuery(account_number, after):
+    query = {"$or": [{"sender": account_number}, {"receiver": account_number}]}
+    if after:
+        time_stamp, transaction_id = decodeHistoryCursor(after)
+        query = {"$and": [query, {"$or": [
+            {"time_stamp": {"$lt": time_stamp}},
+            {"time_stamp": time_stamp, "_id": {"$lt": transaction_id}},
+        ]}]}
+    return query
+
+def toHistoryEntry(t, account_number):
+    debit = t["sender"] == account_number
+    return {
+        "account_number": t["receiver"] if debit else t["sender"],
+        "amount": t["amount"],
+        "reason": t["reason"],
+        "time_stamp": f"{t['time_stamp']}",
+        "type": "debit" if debit else "credit",
+        "transaction_id": str(t["_id"]),
+    }
 
 class TransactionGeneric:
     def __init__(self):
-        self.accounts_service_url = ACCOUNTS_SERVICE_URL
+        self.accounts_client = accounts_client
+        self.db_transfer_engine = DbTransferEngine(client) if transfer_engine == "db" else None
 
     def SendMoney(self, request):
-        sender_account = self.__getAccount(request.sender_account_number)
-        receiver_account = self.__getAccount(request.receiver_account_number)
+        # Checked before either engine, so both reject the same requests
+        amount = parse_amount(request.amount)
+        invalid = invalid_transfer(request.sender_account_number, request.receiver_account_number, amount)
+        if invalid:
+            return {"approved": False, "message": invalid}
+        fingerprint = request_fingerprint(
+            "transfer",
+            request.sender_account_number,
+            request.receiver_account_number,
+            amount,
+            request.reason or "",
+        )
+        return idempotency.run(
+            getattr(request, 'idempotency_key', None), fingerprint, lambda: self.__sendMoney(request)
+        )
+
+    def __sendMoney(self, request):
+        try:
+            with transfer_lanes.hold(request.sender_account_number, request.receiver_account_number):
+                return self.__sendMoneyInLanes(request)
+        except LaneBusy as e:
+            logging.debug(str(e))
+            return {"approved": False, "message": LANE_BUSY_MESSAGE}
+
+    def __sendMoneyInLanes(self, request):
+        if self.db_transfer_engine:
+            return self.db_transfer_engine.transfer(
+                request.sender_account_number,
+                request.receiver_account_number,
+                request.amount,
+                request.reason,
+            )
+
+        accounts = self.__getAccounts(
+            [request.sender_account_number, request.receiver_account_number]
+        )
+        if accounts is None:
+            return {"approved": False, "message": ACCOUNTS_UNAVAILABLE_MESSAGE}
+        sender_account = accounts.get(request.sender_account_number)
+        receiver_account = accounts.get(request.receiver_account_number)
         return self.__transfer(
-            sender_account, receiver_account, float(request.amount), request.reason
+            sender_account, receiver_account, float(request.amount), request.reason,
+            getattr(request, 'ledger_mode', None),
         )
 
+    # Applies many transfers with one account lookup, one debit per sender,
+    # one bulk credit and one ledger insert_many. Returns per-item results;
+    # with all_or_nothing any failure rejects (and compensates) the batch.
+    def SendMoneyBatch(self, request):
+        transfers = list(request.transfers or [])
+        all_or_nothing = bool(request.all_or_nothing)
+        if not transfers:
+            return {"approved": False, "message": "The batch is empty.", "results": []}
+        if len(transfers) > BATCH_TRANSFER_MAX_ITEMS:
+            return {
+                "approved": False,
+                "message": f"The batch exceeds {BATCH_TRANSFER_MAX_ITEMS} transfers.",
+                "results": [],
+            }
+
+        if self.db_transfer_engine:
+            return self.db_transfer_engine.transfer_batch(transfers, all_or_nothing)
+
+        accounts = self.__getAccounts(batch_account_numbers(transfers))
+        if accounts is None:
+            return batch_response(
+                [{"index": i, "approved": False, "message": ACCOUNTS_UNAVAILABLE_MESSAGE} for i in range(len(transfers))]
+            )
+        results, accepted = plan_batch(transfers, accounts, all_or_nothing)
+        debits, _ = aggregate_batch(transfers, accepted)
+
+        def of_senders(indexes, senders):
+            return [i for i in indexes if transfers[i].sender_account_number in senders]
+
+        def of_receivers(indexes, receivers):
+            return [i for i in indexes if transfers[i].receiver_account_number in receivers]
+
+        # Same rule as __transfer: a debit, credit or compensation whose
+        # outcome is unknown is never compensated; its items get
+        # OUTCOME_UNKNOWN_MESSAGE and keep the idempotency key.
+
+        # One debit per sender; the balance may have changed since the lookup
+        debited = {}
+        for sender, total in debits.items():
+            update_sender = self.__adjustBalance(sender, -total)
+            if update_sender["success"]:
+                debited[sender] = total
+                continue
+            if update_sender.get("unknown"):
+                logging.error(f"Batch debit of {total} from {sender} has an unknown outcome, needs reconciliation")
+                message = OUTCOME_UNKNOWN_MESSAGE
+            elif update_sender["message"] == "Insufficient Balance":
+                message = "Insufficient Balance"
+            else:
+                message = "Failed to update sender balance."
+            reject_items(results, of_senders(accepted, {sender}), message)
+            accepted = [i for i in accepted if transfers[i].sender_account_number != sender]
+
+        if all_or_nothing and len(debited) < len(debits):
+            not_refunded = self.__refund(debited)
+            reject_items(results, of_senders(accepted, not_refunded), OUTCOME_UNKNOWN_MESSAGE)
+            reject_items(results, of_senders(accepted, set(debited) - not_refunded), BATCH_REJECTED_MESSAGE)
+            return batch_response(results)
+
+        _, credits = aggregate_batch(transfers, accepted)
+        try:
+            credited = self.accounts_client.credit_accounts(credits) if credits else {}
+        except AccountsClientError as e:
+            # The bulk credit may have been applied, so nothing is refunded
+            logging.error(f"Batch credit of {len(credits)} receivers has an unknown outcome, needs reconciliation: {e}")
+            reject_items(results, accepted, OUTCOME_UNKNOWN_MESSAGE)
+            return batch_response(results)
+
+        failed = [i for i in accepted if not credited.get(transfers[i].receiver_account_number)]
+        if failed:
+            # Compensate: refund the senders of the failed transfers
+            refunds, _ = aggregate_batch(transfers, failed)
+            not_refunded = self.__refund(refunds)
+            reject_items(results, failed, "Failed to update receiver balance.")
+            reject_items(results, of_senders(failed, not_refunded), OUTCOME_UNKNOWN_MESSAGE)
+            accepted = [i for i in accepted if credited.get(transfers[i].receiver_account_number)]
+            if all_or_nothing:
+                refunds, reversals = aggregate_batch(transfers, accepted)
+                not_refunded = self.__refund(refunds)
+                not_reversed = self.__refund({receiver: -total for receiver, total in reversals.items()})
+                reject_items(results, accepted, BATCH_REJECTED_MESSAGE)
+                reject_items(
+                    results,
+                    set(of_senders(accepted, not_refunded)) | set(of_receivers(accepted, not_reversed)),
+                    OUTCOME_UNKNOWN_MESSAGE,
+                )
+                return batch_response(results)
+
+        if accepted:
+            rows = ledger_rows(transfers, accepted, datetime.datetime.now())
+            try:
+                collection_transactions.insert_many(rows)
+                recordDailyStats(rows)
+            except Exception as e:
+                logging.error(f"Ledger entries of {len(rows)} batch transfers failed after the transfers: {e}")
+                for index in accepted:
+                    results[index]["message"] = "Transaction is Successful, but its ledger entry is missing."
+        return batch_response(results)
+
     def GetTransactionByID(self, request):
         transaction_id = request.transaction_id
         logging.debug(f"Transaction ID: {transaction_id}")
-        count = collection_transactions.count_documents(
-            {"_id": ObjectId(transaction_id)}
-        )
+        transaction = transaction_cache.get_or_load(transaction_id, self.__loadTransaction)
+        return transaction or {}
 
-        if count == 0:
-            return {}
-
-        transaction = collection_transactions.find_one(
-            {"_id": ObjectId(transaction_id)}
-        )
+    def __loadTransaction(self, transaction_id):
+        transaction = collection_transactions.find_one({"_id": transaction_id})
+        if transaction is None:
+            return None
 
         return {
             "account_number": transaction["receiver"],
@@ -93,50 +426,201 @@ class TransactionGeneric:
             "transaction_id": str(transaction["_id"]),
         }
 
+    # One page of an account's history, newest first. Returns the entries and
+    # the cursor for the next page ("" on the last page). Raises ValueError
+    # for a malformed `after` cursor.
     def GetTransactionsHistory(self, request):
         account_number = request.account_number
-        # logging.debug(f"Account Number: {account_number}")
+        limit = int(getattr(request, 'limit', 0) or HISTORY_PAGE_SIZE)
+        limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+        after = getattr(request, 'after', None)  # Optional
+
+        query = historyQuery(account_number, after)
+        state = archiveState()
+
+        # Fetch one extra row to learn whether another page exists
+        transactions = list(
+            collection_transactions.find(hotQuery(query, state))
+            .sort([("time_stamp", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        # Older rows continue in the archive
+        if state and len(transactions) <= limit:
+            cold = cold_store.iter_rows(
+                state, account_number, after=decodeHistoryCursor(after) if after else None, descending=True
+            )
+            transactions += itertools.islice(cold, limit + 1 - len(transactions))
 
-        # find based on account number only based on sender
-        transactions_credit = collection_transactions.find({"sender": account_number})
-        transactions_debit = collection_transactions.find({"receiver": account_number})
+        next_after = ""
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            next_after = encodeHistoryCursor(transactions[-1])
 
-        transactions_list = []
-        for t in transactions_credit:
-            temp_t = {
-                "account_number": t["receiver"],
-                "amount": t["amount"],
-                "reason": t["reason"],
-                "time_stamp": f"{t['time_stamp']}",
-                "type": "credit",
-                "transaction_id": str(t["_id"]),
-            }
-            transactions_list.append(temp_t)
-
-        for t in transactions_debit:
-            temp_t = {
-                "account_number": t["receiver"],
-                "amount": t["amount"],
-                "reason": t["reason"],
-                "time_stamp": f"{t['time_stamp']}",
-                "type": "credit",
-                "transaction_id": str(t["_id"]),
-            }
-            transactions_list.append(temp_t)
+        return {
+            "transactions": [toHistoryEntry(t, account_number) for t in transactions],
+            "next_after": next_after,
+        }
 
-        return transactions_list
+    # Generator over an account's whole history, newest first, fed by the
+    # Mongo cursor batch by batch. The batch size and query are checked
+    # before the first item so bad input raises ValueError here, not
+    # mid-stream. Closing the generator closes the cursor.
+    def iterTransactionsHistory(self, request):
+        account_number = request.account_number
+        batch_size = getattr(request, 'batch_size', None) or HISTORY_STREAM_BATCH_SIZE
+        try:
+            batch_size = int(batch_size)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid batch_size: {batch_size}")
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch_size: {batch_size}")
+        after = getattr(request, 'after', None)
+        query = historyQuery(account_number, after)
+        state = archiveState()
+
+        def generate():
+            cursor = collection_transactions.find(hotQuery(query, state), batch_size=batch_size)
+            with cursor.sort([("time_stamp", -1), ("_id", -1)]):
+                for t in cursor:
+                    yield toHistoryEntry(t, account_number)
+            if state:
+                cold = cold_store.iter_rows(
+                    state, account_number, after=decodeHistoryCursor(after) if after else None, descending=True
+                )
+                for t in cold:
+                    yield toHistoryEntry(t, account_number)
+
+        return generate()
+
+    # Export of an account's and/or a date range's ledger rows, streamed
+    # from one cursor. Returns (media type, generator of encoded chunks).
+    # Raises ValueError for a bad format or dates.
+    def iterTransactionsExport(self, request):
+        fmt = request.format or "ndjson"
+        query, cold = self.__exportSource(request)
+        chunks = export.iter_export(collection_transactions, query, fmt, EXPORT_BATCH_SIZE, cold)
+        return export.MEDIA_TYPES[fmt], chunks
+
+    # Same export written to EXPORT_DIR/<file_name>. Raises ValueError for
+    # bad input or when EXPORT_DIR is not configured.
+    def WriteTransactionsExport(self, request):
+        if not EXPORT_DIR:
+            raise ValueError("Exports to a local path are disabled, EXPORT_DIR is not set")
+        file_name = os.path.basename(request.file_name or "")
+        if not file_name or file_name.startswith("."):
+            raise ValueError(f"Invalid file name: {request.file_name}")
+        fmt = request.format or "ndjson"
+        query, cold = self.__exportSource(request)
+        path = os.path.join(EXPORT_DIR, file_name)
+        rows = export.write_export(collection_transactions, query, fmt, path, EXPORT_BATCH_SIZE, cold)
+        return {"path": path, "rows": rows}
+
+    # Hot query and archived rows (read lazily, none if the range starts
+    # after the archive cutoff) for an export request
+    def __exportSource(self, request):
+        start, end = export.export_range(request.start_date, request.end_date)
+        query = export.export_query(request.account_number, start, end)
+        state = archiveState()
+        if state is None:
+            return query, ()
+        cold = cold_store.iter_rows(state, request.account_number or None, start, end)
+        return hotQuery(query, state), cold
+
+    # Per-day or per-month credit/debit totals for an account over
+    # start_date..end_date (YYYY-MM-DD, inclusive), read from the daily
+    # aggregates. Raises ValueError for bad dates or granularity.
+    def GetTransactionSummary(self, request):
+        if request.end_date:
+            end_day = daily_stats.parse_day(request.end_date)
+        else:
+            end_day = daily_stats.day_of(datetime.datetime.now())
+        if request.start_date:
+            start_day = daily_stats.parse_day(request.start_date)
+        else:
+            start_day = end_day - datetime.timedelta(days=SUMMARY_DEFAULT_DAYS - 1)
+
+        return daily_stats.summarize(
+            collection_daily_stats,
+            request.account_number,
+            start_day,
+            end_day,
+            request.granularity or "day",
+        )
 
     def Zelle(self, request):
+        amount = parse_amount(request.amount)
+        if amount is None:
+            return {"approved": False, "message": "Amount must be a positive number."}
+        if request.sender_email == request.receiver_email:
+            return {"approved": False, "message": "Sender and receiver must differ."}
+        fingerprint = request_fingerprint(
+            "zelle",
+            request.sender_email,
+            request.receiver_email,
+            amount,
+            request.reason or "",
+        )
+        return idempotency.run(
+            getattr(request, 'idempotency_key', None), fingerprint, lambda: self.__zelle(request)
+        )
+
+    def __zelle(self, request):
         sender_email = request.sender_email
         receiver_email = request.receiver_email
         amount = float(request.amount)
         reason = request.reason
-        sender_account = self.__getAccountByEmail(sender_email)
-        receiver_account = self.__getAccountByEmail(receiver_email)
+        ledger_mode = getattr(request, 'ledger_mode', None)
+
+        try:
+            sender_account, sender_cached = self.__resolveAccount(sender_email)
+            receiver_account, receiver_cached = self.__resolveAccount(receiver_email)
+        except AccountsClientError as e:
+            logging.error(f"Failed to resolve Zelle accounts: {e}")
+            return {"approved": False, "message": ACCOUNTS_UNAVAILABLE_MESSAGE}
+        result = self.__zelleTransfer(sender_account, receiver_account, amount, reason, ledger_mode)
+
+        # A cached account number may be stale (e.g. the account was removed).
+        # These failures moved no money, so resolve that side again and retry once
+        message = result["message"]
+        stale_sender = sender_cached and sender_account is not None and message in (
+            "Sender Account Not Found.", "Failed to update sender balance."
+        )
+        stale_receiver = receiver_cached and receiver_account is not None and message in (
+            "Receiver Account Not Found.", "Failed to update receiver balance."
+        )
+        try:
+            if stale_sender:
+                account_resolver.invalidate(sender_email)
+                sender_account, _ = self.__resolveAccount(sender_email)
+            if stale_receiver:
+                account_resolver.invalidate(receiver_email)
+                receiver_account, _ = self.__resolveAccount(receiver_email)
+        except AccountsClientError as e:
+            logging.error(f"Failed to resolve Zelle accounts: {e}")
+            return {"approved": False, "message": ACCOUNTS_UNAVAILABLE_MESSAGE}
+        if stale_sender or stale_receiver:
+            result = self.__zelleTransfer(sender_account, receiver_account, amount, reason, ledger_mode)
+        return result
+
+    def __zelleTransfer(self, sender_account, receiver_account, amount, reason, ledger_mode):
+        if not sender_account or not receiver_account:
+            return self.__transfer(sender_account, receiver_account, amount, reason, ledger_mode)
+        try:
+            with transfer_lanes.hold(sender_account["account_number"], receiver_account["account_number"]):
+                return self.__zelleTransferInLanes(sender_account, receiver_account, amount, reason, ledger_mode)
+        except LaneBusy as e:
+            logging.debug(str(e))
+            return {"approved": False, "message": LANE_BUSY_MESSAGE}
+
+    def __zelleTransferInLanes(self, sender_account, receiver_account, amount, reason, ledger_mode):
+        if self.db_transfer_engine:
+            return self.db_transfer_engine.transfer(
+                sender_account["account_number"], receiver_account["account_number"], amount, reason
+            )
 
-        return self.__transfer(sender_account, receiver_account, amount, reason)
+        return self.__transfer(sender_account, receiver_account, amount, reason, ledger_mode)
 
-    def __transfer(self, sender_account, receiver_account, amount, reason):
+    def __transfer(self, sender_account, receiver_account, amount, reason, ledger_mode=None):
         # if sender_account is not None or receiver_account is not None:
         if sender_account is None:
             return {"approved": False, "message": "Sender Account Not Found."}
@@ -144,82 +628,120 @@ class TransactionGeneric:
         if receiver_account is None:
             return {"approved": False, "message": "Receiver Account Not Found."}
 
-        # Überprüfen des Saldos
-        if sender_account["balance"] < amount:
-            return {"approved": False, "message": "Insufficient Balance"}
-
-        # Berechnung neuer Salden
-        new_sender_balance = sender_account["balance"] - amount
-        new_receiver_balance = receiver_account["balance"] + amount
-
-        # Aktualisieren der Salden über den Accounts Service
-        update_sender = self.__updateBalance(sender_account["account_number"], new_sender_balance)
-        if not update_sender:
+        # Debit the sender as a compare-and-set on the version read; on a
+        # conflict the accounts service returns the current balance and
+        # version. Without a balance read (Zelle) only the accounts
+        # service's floor guard applies, with no version.
+        balance = sender_account.get("balance")
+        version = sender_account.get("version", 0) if balance is not None else None
+        for attempt in range(TRANSFER_CAS_RETRIES + 1):
+            # The first read may be a stale cached balance, so the floor guard
+            # decides; after a conflict the balance comes from the database
+            if attempt and balance < amount:
+                return {"approved": False, "message": "Insufficient Balance"}
+
+            transfer_metrics.incr("debit_attempts")
+            update_sender = self.__adjustBalance(
+                sender_account["account_number"], -amount, expected_version=version
+            )
+            if update_sender["message"] != "Version conflict":
+                break
+            transfer_metrics.incr("version_conflicts")
+            if attempt == TRANSFER_CAS_RETRIES:
+                transfer_metrics.incr("retries_exhausted")
+                return {"approved": False, "message": CAS_BUSY_MESSAGE}
+            transfer_metrics.incr("retries")
+            balance, version = update_sender["balance"], update_sender["version"]
+            time.sleep(random.uniform(0, TRANSFER_CAS_BACKOFF * (2 ** attempt)))
+
+        sender = sender_account["account_number"]
+        receiver = receiver_account["account_number"]
+        if not update_sender["success"]:
+            if update_sender.get("unknown"):
+                logging.error(f"Debit of {amount} from {sender} has an unknown outcome, needs reconciliation")
+                return {"approved": False, "message": OUTCOME_UNKNOWN_MESSAGE}
+            if update_sender["message"] == "Insufficient Balance":
+                return {"approved": False, "message": "Insufficient Balance"}
             return {"approved": False, "message": "Failed to update sender balance."}
 
-        update_receiver = self.__updateBalance(receiver_account["account_number"], new_receiver_balance)
-        if not update_receiver:
-            # Rollback der Sender-Balance, falls Aktualisierung der Receiver-Balance fehlschlägt
-            self.__updateBalance(sender_account["account_number"], sender_account["balance"])
+        # From here on money has moved: nothing below may raise, and only a
+        # fully compensated failure may report that nothing happened
+        update_receiver = self.__adjustBalance(receiver, amount)
+        if not update_receiver["success"]:
+            if update_receiver.get("unknown"):
+                # The credit may have been applied, so refunding could create money
+                logging.error(
+                    f"Credit of {amount} to {receiver} has an unknown outcome after debiting {sender}, "
+                    f"needs reconciliation"
+                )
+                return {"approved": False, "message": OUTCOME_UNKNOWN_MESSAGE}
+            # Refund the sender, since the receiver was not credited
+            refund = self.__adjustBalance(sender, amount)
+            if not refund["success"]:
+                logging.error(f"Refund of {amount} to {sender} failed: {refund['message']}, needs reconciliation")
+                return {"approved": False, "message": OUTCOME_UNKNOWN_MESSAGE}
             return {"approved": False, "message": "Failed to update receiver balance."}
 
         # Hinzufügen der Transaktion zur Datenbank
-        self.__addTransaction(sender_account["account_number"], receiver_account["account_number"], amount, reason)
+        try:
+            self.__addTransaction(sender, receiver, amount, reason, ledger_mode)
+        except Exception as e:
+            logging.error(f"Ledger entry for {amount} from {sender} to {receiver} failed after the transfer: {e}")
+            return {"approved": True, "message": "Transaction is Successful, but its ledger entry is missing."}
 
         return {"approved": True, "message": "Transaction is Successful."}
 
-    def __updateBalance(self, account_number, new_balance):
-        url = f"{self.accounts_service_url}/update-balance"
-        payload = {
-            "account_number": account_number,
-            "new_balance": new_balance
-        }
+    def __adjustBalance(self, account_number, delta, expected_version=None):
         try:
-            response = requests.post(url, json=payload)
-            return response.status_code == 200
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to update balance for account {account_number}: {e}")
-            return False
-
-    def __addTransaction(self, sender, receiver, amount, reason):
-        collection_transactions.insert_one(
-            {
-                "sender": sender,
-                "receiver": receiver,
-                "amount": amount,
-                "reason": reason,
-                "time_stamp": datetime.datetime.now(),
-            }
-        )
-
-    def __getAccountByEmail(self, email, account_type=None):
-        url = f"{self.accounts_service_url}/get-account-by-email"
-        payload = {"email_id": email}
-        if account_type:
-            payload["account_type"] = account_type
-        try:
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logging.debug(f"Account with email {email} not found.")
-                return None
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to get account by email {email}: {e}")
-            return None
-
-    def __getAccount(self, account_num):
-        url = f"{self.accounts_service_url}/account-detail"
-        payload = {"account_number": account_num}
+            return self.accounts_client.adjust_balance(account_number, delta, expected_version)
+        except AccountsClientError as e:
+            # The request may have been applied before it failed
+            logging.error(f"Failed to adjust balance for account {account_number}: {e}")
+            return {"success": False, "balance": 0, "version": 0, "message": str(e), "unknown": True}
+
+    # Best-effort compensation, one balance adjustment per account. Returns
+    # the set of accounts whose compensation failed or has an unknown outcome.
+    def __refund(self, amounts):
+        failed = set()
+        for account_number, amount in amounts.items():
+            result = self.__adjustBalance(account_number, amount)
+            if not result["success"]:
+                logging.error(
+                    f"Compensation of {amount} on {account_number} failed: {result['message']}, needs reconciliation"
+                )
+                failed.add(account_number)
+        return failed
+
+    def __addTransaction(self, sender, receiver, amount, reason, ledger_mode=None):
+        row = {
+            "sender": sender,
+            "receiver": receiver,
+            "amount": amount,
+            "reason": reason,
+            "time_stamp": datetime.datetime.now(),
+        }
+        if ledger_writes == "group":
+            ledger_writer.write(row, mode=ledger_mode or LEDGER_DEFAULT_MODE)
+        else:
+            collection_transactions.insert_one(row)
+            recordDailyStats([row])
+
+    # Returns ({"account_number": ...} or None, cached). Raises
+    # AccountsClientError, which must not be mistaken for "not found".
+    def __resolveAccount(self, email, account_type=None):
+        account_number, cached = account_resolver.resolve(email, account_type)
+        if account_number is None:
+            logging.debug(f"Account with email {email} not found.")
+            return None, cached
+        return {"account_number": account_number}, cached
+
+    # None when the accounts service could not be asked, as opposed to {}
+    # for accounts that do not exist
+    def __getAccounts(self, account_nums):
         try:
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logging.debug(f"Account with number {account_num} not found.")
-                return None
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to get account {account_num}: {e}")
+            return self.accounts_client.get_accounts(account_nums)
+        except AccountsClientError as e:
+            logging.error(f"Failed to get accounts {account_nums}: {e}")
             return None
 
 
@@ -239,6 +761,14 @@ class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
         t = TransactionResponse(approved=result["approved"], message=result["message"])
         return t
 
+    def sendMoneyBatch(self, request, context):
+        result = self.transaction.SendMoneyBatch(request)
+        return BatchTransactionResponse(
+            approved=result["approved"],
+            message=result["message"],
+            results=[BatchTransferResult(**r) for r in result["results"]],
+        )
+
     def getTransactionByID(self, request, context):
         result = self.transaction.GetTransactionByID(request)
         if len(result) == 0:
@@ -254,9 +784,12 @@ class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
             )
 
     def getTransactionsHistory(self, request, context):
-        results = self.transaction.GetTransactionsHistory(request)
+        try:
+            results = self.transaction.GetTransactionsHistory(request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         transactions_list = []
-        for t in results:
+        for t in results["transactions"]:
             temp_t = Transaction(
                 account_number=t["account_number"],
                 amount=t["amount"],
@@ -267,7 +800,33 @@ class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
             )
             transactions_list.append(temp_t)
 
-        return GetALLTransactionsResponse(transactions=transactions_list)
+        return GetALLTransactionsResponse(
+            transactions=transactions_list, next_after=results["next_after"]
+        )
+
+    def getTransactionSummary(self, request, context):
+        try:
+            result = self.transaction.GetTransactionSummary(request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return TransactionSummaryResponse(
+            buckets=[TransactionSummaryBucket(**bucket) for bucket in result["buckets"]],
+            total=TransactionSummaryBucket(**result["total"]),
+        )
+
+    def streamTransactionsHistory(self, request, context):
+        try:
+            transactions = self.transaction.iterTransactionsHistory(request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        try:
+            for t in transactions:
+                if not context.is_active():
+                    logging.debug("Stream Transactions History cancelled by client")
+                    break
+                yield Transaction(**t)
+        finally:
+            transactions.close()
 
 
 app = Flask(__name__)
@@ -277,14 +836,23 @@ transaction_generic = TransactionGeneric()
 def sendMoney():
     data = request.json
     data = DotMap(data)
+    data.idempotency_key = data.idempotency_key or request.headers.get("Idempotency-Key")
     result = transaction_generic.SendMoney(data)
     return jsonify(result)
 
+@app.route("/transfer-batch", methods=["POST"])
+def sendMoneyBatch():
+    data = request.json
+    data = DotMap(data)
+    result = transaction_generic.SendMoneyBatch(data)
+    return jsonify(result)
+
 @app.route("/zelle", methods=["POST"])
 def zelle():
     logging.debug(" Zelle API called")
     data = request.json
     data = DotMap(data)
+    data.idempotency_key = data.idempotency_key or request.headers.get("Idempotency-Key")
     result = transaction_generic.Zelle(data)
     return jsonify(result)
 
@@ -296,16 +864,103 @@ def getTransactionByID():
     result = transaction_generic.GetTransactionByID(data)
     return jsonify(result)
 
+@app.route("/ledger-writer/stats", methods=["GET"])
+def getLedgerWriterStats():
+    return jsonify({"ledger_writes": ledger_writes, **ledger_writer.stats()})
+
+@app.route("/transfer-lanes/stats", methods=["GET"])
+def getTransferLaneStats():
+    return jsonify(transfer_lanes.stats())
+
+@app.route("/transfer-metrics", methods=["GET"])
+def getTransferMetrics():
+    return jsonify(transfer_metrics.snapshot())
+
+@app.route("/account-resolver/stats", methods=["GET"])
+def getAccountResolverStats():
+    return jsonify(account_resolver.stats())
+
+@app.route("/transaction-cache/stats", methods=["GET"])
+def getTransactionCacheStats():
+    return jsonify(transaction_cache.stats())
+
 @app.route("/transaction-history", methods=["POST"])
 def getTransactionsHistory():
     data = request.json
     data = DotMap(data)
-    result = transaction_generic.GetTransactionsHistory(data)
+    try:
+        result = transaction_generic.GetTransactionsHistory(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify(result)
+
+@app.route("/transaction-summary", methods=["POST"])
+def getTransactionSummary():
+    data = request.json
+    data = DotMap(data)
+    try:
+        result = transaction_generic.GetTransactionSummary(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     return jsonify(result)
 
+# Streams history as NDJSON; the WSGI server closes the generator (and the
+# cursor) when the client disconnects
+@app.route("/stream-transaction-history", methods=["POST"])
+def streamTransactionsHistory():
+    data = request.json
+    data = DotMap(data)
+    try:
+        transactions = transaction_generic.iterTransactionsHistory(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def generate():
+        try:
+            for t in transactions:
+                yield json.dumps(t) + "\n"
+        finally:
+            transactions.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# Streams the export as a download; with file_name set it is written to
+# EXPORT_DIR instead and the path and row count are returned
+@app.route("/export-transactions", methods=["POST"])
+def exportTransactions():
+    data = request.json
+    data = DotMap(data)
+    try:
+        if data.file_name:
+            return jsonify(transaction_generic.WriteTransactionsExport(data))
+        media_type, chunks = transaction_generic.iterTransactionsExport(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def generate():
+        try:
+            yield from chunks
+        finally:
+            chunks.close()
+
+    extension = data.format or "ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=media_type,
+        headers={"Content-Disposition": f"attachment; filename=transactions.{extension}"},
+    )
+
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0' ,port=port, debug=True)
+    if http_server_mode == "production":
+        logging.debug(f"Starting production HTTP server on port {port}")
+        serve(app, port)
+    else:
+        logging.debug(f"Starting Flask server on port {port}")
+        # SIGTERM would kill the process without running atexit; exit
+        # through SystemExit so the ledger writer is drained. The reloader
+        # is off because it serves from a child that it SIGKILLs on exit.
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        app.run(host='0.0.0.0' ,port=port, debug=True, use_reloader=False)
 
 def serverGRPC(port):
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
@@ -315,10 +970,16 @@ def serverGRPC(port):
     server.add_insecure_port(f"[::]:{port}")
     logging.debug(f"Starting server. Listening on port {port}.")
     server.start()
+    # On SIGTERM stop taking RPCs and let in-flight ones finish, then flush
+    # the rows they queued; SIGTERM alone would skip atexit
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop(GRPC_SHUTDOWN_GRACE))
     server.wait_for_termination()
+    logging.debug("Server stopped, draining the ledger writer")
+    ledger_writer.drain()
 
 if __name__ == "__main__":
     port  = 50052
+    ensure_indexes(db)
     # serverGRPC(port)
     # serverFlask(port)
 
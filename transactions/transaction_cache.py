@@ -0,0 +1,100 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+from collections import OrderedDict
+import sys
+import threading
+
+from bson.objectid import ObjectId
+
+
+def record_size(key, record):
+    """Approximate in-memory size of a cached flat record, in bytes."""
+    return (
+        sys.getsizeof(key)
+        + sys.getsizeof(record)
+        + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in record.items())
+    )
+
+
+class TransactionCache:
+    """Bounded in-process LRU cache of transaction records keyed by _id.
+
+    Transactions are never modified once written, so entries have no TTL
+    and are only dropped to stay under max_bytes. Malformed ids are
+    rejected before the loader (and the database) is called. Misses are not
+    cached. Safe to share between the gRPC worker threads and Flask request
+    threads; when disabled every lookup goes to the loader.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, enabled=True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled and max_bytes > 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def get_or_load(self, transaction_id, load):
+        """Return the record for transaction_id, or None if the id is
+        malformed or load(ObjectId) finds nothing."""
+        if not ObjectId.is_valid(transaction_id):
+            with self._lock:
+                self.rejected += 1
+            return None
+        key = str(transaction_id)
+
+        if self.enabled:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+        record = load(ObjectId(key))
+        if record is not None:
+            self.put(key, record)
+        return record
+
+    def put(self, key, record):
+        if not self.enabled:
+            return
+        size = record_size(key, record)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (record, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
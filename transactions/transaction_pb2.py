@@ -4,12 +4,23 @@
 
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
 # source: transaction.proto
+# Protobuf Python Version: 7.35.1
 """Generated protocol buffer code."""
-from google.protobuf.internal import builder as _builder
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
 from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'transaction.proto'
+)
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
@@ -17,27 +28,41 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11transaction.proto\"\xb0\x01\n\x12TransactionRequest\x12\x1d\n\x15sender_account_number\x18\x01 \x01(\t\x12\x1b\n\x13sender_account_type\x18\x02 \x01(\t\x12\x1f\n\x17receiver_account_number\x18\x03 \x01(\t\x12\x1d\n\x15receiver_account_type\x18\x04 \x01(\t\x12\x0e\n\x06\x61mount\x18\x05 \x01(\x01\x12\x0e\n\x06reason\x18\x06 \x01(\t\"8\n\x13TransactionResponse\x12\x10\n\x08\x61pproved\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"3\n\x19GetALLTransactionsRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\"\x7f\n\x0bTransaction\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x0e\n\x06reason\x18\x03 \x01(\t\x12\x12\n\ntime_stamp\x18\x04 \x01(\t\x12\x0c\n\x04type\x18\x05 \x01(\t\x12\x16\n\x0etransaction_id\x18\x06 \x01(\t\"@\n\x1aGetALLTransactionsResponse\x12\"\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x0c.Transaction\"\\\n\x0cZelleRequest\x12\x14\n\x0csender_email\x18\x01 \x01(\t\x12\x16\n\x0ereceiver_email\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x0e\n\x06reason\x18\x04 \x01(\t\"0\n\x16TransactionByIDRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t2\x8a\x02\n\x12TransactionService\x12\x36\n\tsendMoney\x12\x13.TransactionRequest\x1a\x14.TransactionResponse\x12Q\n\x16getTransactionsHistory\x12\x1a.GetALLTransactionsRequest\x1a\x1b.GetALLTransactionsResponse\x12,\n\x05Zelle\x12\r.ZelleRequest\x1a\x14.TransactionResponse\x12;\n\x12getTransactionByID\x12\x17.TransactionByIDRequest\x1a\x0c.Transactionb\x06proto3')
-
-_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
-_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'transaction_pb2', globals())
-if _descriptor._USE_C_DESCRIPTORS == False:
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11transaction.proto\"\xde\x01\n\x12TransactionRequest\x12\x1d\n\x15sender_account_number\x18\x01 \x01(\t\x12\x1b\n\x13sender_account_type\x18\x02 \x01(\t\x12\x1f\n\x17receiver_account_number\x18\x03 \x01(\t\x12\x1d\n\x15receiver_account_type\x18\x04 \x01(\t\x12\x0e\n\x06\x61mount\x18\x05 \x01(\x01\x12\x0e\n\x06reason\x18\x06 \x01(\t\x12\x17\n\x0fidempotency_key\x18\x07 \x01(\t\x12\x13\n\x0bledger_mode\x18\x08 \x01(\t\"8\n\x13TransactionResponse\x12\x10\n\x08\x61pproved\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"Y\n\x17\x42\x61tchTransactionRequest\x12&\n\ttransfers\x18\x01 \x03(\x0b\x32\x13.TransactionRequest\x12\x16\n\x0e\x61ll_or_nothing\x18\x02 \x01(\x08\"G\n\x13\x42\x61tchTransferResult\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x10\n\x08\x61pproved\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\"d\n\x18\x42\x61tchTransactionResponse\x12\x10\n\x08\x61pproved\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12%\n\x07results\x18\x03 \x03(\x0b\x32\x14.BatchTransferResult\"Q\n\x19GetALLTransactionsRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x03 \x01(\t\"\x7f\n\x0bTransaction\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x0e\n\x06reason\x18\x03 \x01(\t\x12\x12\n\ntime_stamp\x18\x04 \x01(\t\x12\x0c\n\x04type\x18\x05 \x01(\t\x12\x16\n\x0etransaction_id\x18\x06 \x01(\t\"T\n\x1aGetALLTransactionsResponse\x12\"\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x0c.Transaction\x12\x12\n\nnext_after\x18\x02 \x01(\t\"V\n\x19StreamTransactionsRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x12\n\nbatch_size\x18\x02 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x03 \x01(\t\"\x8a\x01\n\x0cZelleRequest\x12\x14\n\x0csender_email\x18\x01 \x01(\t\x12\x16\n\x0ereceiver_email\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x0e\n\x06reason\x18\x04 \x01(\t\x12\x17\n\x0fidempotency_key\x18\x05 \x01(\t\x12\x13\n\x0bledger_mode\x18\x06 \x01(\t\"0\n\x16TransactionByIDRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\"n\n\x19TransactionSummaryRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\x12\x13\n\x0bgranularity\x18\x04 \x01(\t\"\x82\x01\n\x18TransactionSummaryBucket\x12\x0e\n\x06period\x18\x01 \x01(\t\x12\x15\n\rcredit_amount\x18\x02 \x01(\x01\x12\x14\n\x0c\x63redit_count\x18\x03 \x01(\x03\x12\x14\n\x0c\x64\x65\x62it_amount\x18\x04 \x01(\x01\x12\x13\n\x0b\x64\x65\x62it_count\x18\x05 \x01(\x03\"r\n\x1aTransactionSummaryResponse\x12*\n\x07\x62uckets\x18\x01 \x03(\x0b\x32\x19.TransactionSummaryBucket\x12(\n\x05total\x18\x02 \x01(\x0b\x32\x19.TransactionSummaryBucket2\xec\x03\n\x12TransactionService\x12\x36\n\tsendMoney\x12\x13.TransactionRequest\x1a\x14.TransactionResponse\x12Q\n\x16getTransactionsHistory\x12\x1a.GetALLTransactionsRequest\x1a\x1b.GetALLTransactionsResponse\x12,\n\x05Zelle\x12\r.ZelleRequest\x1a\x14.TransactionResponse\x12;\n\x12getTransactionByID\x12\x17.TransactionByIDRequest\x1a\x0c.Transaction\x12G\n\x19streamTransactionsHistory\x12\x1a.StreamTransactionsRequest\x1a\x0c.Transaction0\x01\x12\x45\n\x0esendMoneyBatch\x12\x18.BatchTransactionRequest\x1a\x19.BatchTransactionResponse\x12P\n\x15getTransactionSummary\x12\x1a.TransactionSummaryRequest\x1a\x1b.TransactionSummaryResponseb\x06proto3')
 
-  DESCRIPTOR._options = None
-  _TRANSACTIONREQUEST._serialized_start=22
-  _TRANSACTIONREQUEST._serialized_end=198
-  _TRANSACTIONRESPONSE._serialized_start=200
-  _TRANSACTIONRESPONSE._serialized_end=256
-  _GETALLTRANSACTIONSREQUEST._serialized_start=258
-  _GETALLTRANSACTIONSREQUEST._serialized_end=309
-  _TRANSACTION._serialized_start=311
-  _TRANSACTION._serialized_end=438
-  _GETALLTRANSACTIONSRESPONSE._serialized_start=440
-  _GETALLTRANSACTIONSRESPONSE._serialized_end=504
-  _ZELLEREQUEST._serialized_start=506
-  _ZELLEREQUEST._serialized_end=598
-  _TRANSACTIONBYIDREQUEST._serialized_start=600
-  _TRANSACTIONBYIDREQUEST._serialized_end=648
-  _TRANSACTIONSERVICE._serialized_start=651
-  _TRANSACTIONSERVICE._serialized_end=917
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'transaction_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_TRANSACTIONREQUEST']._serialized_start=22
+  _globals['_TRANSACTIONREQUEST']._serialized_end=244
+  _globals['_TRANSACTIONRESPONSE']._serialized_start=246
+  _globals['_TRANSACTIONRESPONSE']._serialized_end=302
+  _globals['_BATCHTRANSACTIONREQUEST']._serialized_start=304
+  _globals['_BATCHTRANSACTIONREQUEST']._serialized_end=393
+  _globals['_BATCHTRANSFERRESULT']._serialized_start=395
+  _globals['_BATCHTRANSFERRESULT']._serialized_end=466
+  _globals['_BATCHTRANSACTIONRESPONSE']._serialized_start=468
+  _globals['_BATCHTRANSACTIONRESPONSE']._serialized_end=568
+  _globals['_GETALLTRANSACTIONSREQUEST']._serialized_start=570
+  _globals['_GETALLTRANSACTIONSREQUEST']._serialized_end=651
+  _globals['_TRANSACTION']._serialized_start=653
+  _globals['_TRANSACTION']._serialized_end=780
+  _globals['_GETALLTRANSACTIONSRESPONSE']._serialized_start=782
+  _globals['_GETALLTRANSACTIONSRESPONSE']._serialized_end=866
+  _globals['_STREAMTRANSACTIONSREQUEST']._serialized_start=868
+  _globals['_STREAMTRANSACTIONSREQUEST']._serialized_end=954
+  _globals['_ZELLEREQUEST']._serialized_start=957
+  _globals['_ZELLEREQUEST']._serialized_end=1095
+  _globals['_TRANSACTIONBYIDREQUEST']._serialized_start=1097
+  _globals['_TRANSACTIONBYIDREQUEST']._serialized_end=1145
+  _globals['_TRANSACTIONSUMMARYREQUEST']._serialized_start=1147
+  _globals['_TRANSACTIONSUMMARYREQUEST']._serialized_end=1257
+  _globals['_TRANSACTIONSUMMARYBUCKET']._serialized_start=1260
+  _globals['_TRANSACTIONSUMMARYBUCKET']._serialized_end=1390
+  _globals['_TRANSACTIONSUMMARYRESPONSE']._serialized_start=1392
+  _globals['_TRANSACTIONSUMMARYRESPONSE']._serialized_end=1506
+  _globals['_TRANSACTIONSERVICE']._serialized_start=1509
+  _globals['_TRANSACTIONSERVICE']._serialized_end=2001
 # @@protoc_insertion_point(module_scope)
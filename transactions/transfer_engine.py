@@ -0,0 +1,167 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+import logging
+
+import daily_stats
+from batch_transfer import (
+    OUTCOME_UNKNOWN_MESSAGE,
+    aggregate_batch,
+    batch_account_numbers,
+    batch_response,
+    invalid_transfer,
+    ledger_rows,
+    parse_amount,
+    plan_batch,
+)
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+
+class TransferRejected(Exception):
+    pass
+
+
+class DbTransferEngine:
+    """Moves money with one MongoDB multi-document transaction.
+
+    The debit, the credit, the ledger insert and the daily stats update
+    commit together or not at all. ClientSession.with_transaction retries the whole transaction on
+    TransientTransactionError and the commit on UnknownTransactionCommitResult,
+    bounded by its 120 second limit. Requires a replica set or sharded cluster.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.accounts = client["bank"]["accounts"]
+        self.transactions = client["bank"]["transactions"]
+        self.daily_stats = client["bank"][daily_stats.STATS_COLLECTION]
+
+    def transfer(self, sender, receiver, amount, reason):
+        # The guarded debit below only holds for a positive amount
+        amount = parse_amount(amount)
+        invalid = invalid_transfer(sender, receiver, amount)
+        if invalid:
+            return {"approved": False, "message": invalid}
+
+        def apply(session):
+            debit = self.accounts.update_one(
+                {"account_number": sender, "balance": {"$gte": amount}},
+                {"$inc": {"balance": -amount, "version": 1}},
+                session=session,
+            )
+            if debit.matched_count == 0:
+                if self.accounts.count_documents({"account_number": sender}, limit=1, session=session):
+                    raise TransferRejected("Insufficient Balance")
+                raise TransferRejected("Sender Account Not Found.")
+
+            credit = self.accounts.update_one(
+                {"account_number": receiver},
+                {"$inc": {"balance": amount, "version": 1}},
+                session=session,
+            )
+            if credit.matched_count == 0:
+                raise TransferRejected("Receiver Account Not Found.")
+
+            row = {
+                "sender": sender,
+                "receiver": receiver,
+                "amount": amount,
+                "reason": reason,
+                "time_stamp": datetime.datetime.now(),
+            }
+            self.transactions.insert_one(row, session=session)
+            daily_stats.record(self.daily_stats, [row], session=session)
+
+        with self.client.start_session() as session:
+            try:
+                session.with_transaction(
+                    apply,
+                    read_concern=ReadConcern("snapshot"),
+                    write_concern=WriteConcern("majority"),
+                )
+            except TransferRejected as e:
+                logging.debug(f"Transfer {sender} -> {receiver} rejected: {e}")
+                return {"approved": False, "message": str(e)}
+            except PyMongoError as e:
+                # Other errors abort the transaction; only this one may
+                # have committed it, so it must not release the idempotency key
+                if not e.has_error_label("UnknownTransactionCommitResult"):
+                    raise
+                logging.error(f"Transfer {sender} -> {receiver} has an unknown commit result: {e}")
+                return {"approved": False, "message": OUTCOME_UNKNOWN_MESSAGE}
+
+        return {"approved": True, "message": "Transaction is Successful."}
+
+    def transfer_batch(self, transfers, all_or_nothing):
+        """Apply a batch in one transaction: one guarded debit per sender, one
+        bulk write for the credits and one insert_many for the ledger."""
+        def apply(session):
+            accounts = {
+                account["account_number"]: account
+                for account in self.accounts.find(
+                    {"account_number": {"$in": batch_account_numbers(transfers)}},
+                    {"_id": 0, "account_number": 1, "balance": 1},
+                    session=session,
+                )
+            }
+            results, accepted = plan_batch(transfers, accounts, all_or_nothing)
+            debits, credits = aggregate_batch(transfers, accepted)
+
+            # The snapshot read above makes these guards hold; a concurrent
+            # write surfaces as a WriteConflict and the transaction is retried
+            for sender, total in debits.items():
+                debit = self.accounts.update_one(
+                    {"account_number": sender, "balance": {"$gte": total}},
+                    {"$inc": {"balance": -total, "version": 1}},
+                    session=session,
+                )
+                if debit.matched_count == 0:
+                    raise TransferRejected(f"Insufficient Balance on {sender}")
+
+            if credits:
+                self.accounts.bulk_write(
+                    [
+                        UpdateOne({"account_number": receiver}, {"$inc": {"balance": total, "version": 1}})
+                        for receiver, total in credits.items()
+                    ],
+                    ordered=False,
+                    session=session,
+                )
+            if accepted:
+                rows = ledger_rows(transfers, accepted, datetime.datetime.now())
+                self.transactions.insert_many(rows, session=session)
+                daily_stats.record(self.daily_stats, rows, session=session)
+            return results
+
+        with self.client.start_session() as session:
+            try:
+                results = session.with_transaction(
+                    apply,
+                    read_concern=ReadConcern("snapshot"),
+                    write_concern=WriteConcern("majority"),
+                )
+            except TransferRejected as e:
+                logging.debug(f"Batch transfer rejected: {e}")
+                return batch_response(
+                    [{"index": index, "approved": False, "message": str(e)} for index in range(len(transfers))]
+                )
+            except PyMongoError as e:
+                # As in transfer(): only an unknown commit result may have
+                # applied the batch
+                if not e.has_error_label("UnknownTransactionCommitResult"):
+                    raise
+                logging.error(f"Batch transfer has an unknown commit result: {e}")
+                return batch_response(
+                    [
+                        {"index": index, "approved": False, "message": OUTCOME_UNKNOWN_MESSAGE}
+                        for index in range(len(transfers))
+                    ]
+                )
+
+        return batch_response(results)
@@ -0,0 +1,121 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+from contextlib import contextmanager
+import threading
+import time
+import zlib
+
+
+class LaneBusy(Exception):
+    pass
+
+
+class _Lane:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class TransferLanes:
+    """Serializes transfers per account inside one process.
+
+    Each account number hashes to one of `lanes` lanes; a transfer holds
+    the lanes of all its accounts while it runs, so transfers sharing an
+    account run one at a time and others proceed in parallel. Lanes are
+    always locked in ascending lane order, which rules out deadlock even
+    when two accounts share a lane. Waiting longer than timeout seconds
+    raises LaneBusy. With lanes=0 hold() does nothing.
+
+    Waiters block request threads, so at most max_waiters wait per lane;
+    one more raises LaneBusy at once instead of queueing. This keeps a hot
+    account from tying up the whole gRPC worker pool. max_waiters=0 lifts
+    the cap.
+
+    Replicas and workers have their own lanes, so the accounts service's
+    version check still guards against writers in other processes.
+    """
+
+    def __init__(self, lanes=64, timeout=5.0, max_waiters=0):
+        self.timeout = timeout
+        self.max_waiters = max_waiters
+        self._lanes = [_Lane() for _ in range(lanes)]
+        self._stats_lock = threading.Lock()
+
+    def lanes_for(self, *account_numbers):
+        if not self._lanes:
+            return []
+        return sorted({zlib.crc32(a.encode()) % len(self._lanes) for a in account_numbers if a})
+
+    @contextmanager
+    def hold(self, *account_numbers):
+        held = []
+        try:
+            for index in self.lanes_for(*account_numbers):
+                self._acquire(index)
+                held.append(index)
+            yield
+        finally:
+            for index in reversed(held):
+                self._lanes[index].lock.release()
+
+    def _acquire(self, index):
+        lane = self._lanes[index]
+        with self._stats_lock:
+            # A free lane is taken without counting as a waiter
+            if self.max_waiters and lane.waiting >= self.max_waiters and lane.lock.locked():
+                lane.rejected += 1
+                raise LaneBusy(f"Transfer lane {index} has {lane.waiting} waiters")
+            lane.waiting += 1
+        start = time.perf_counter()
+        acquired = lane.lock.acquire(timeout=self.timeout)
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            lane.waiting -= 1
+            if acquired:
+                lane.acquired += 1
+                lane.total_wait += waited
+                lane.max_wait = max(lane.max_wait, waited)
+            else:
+                lane.timeouts += 1
+        if not acquired:
+            raise LaneBusy(f"Transfer lane {index} busy for {self.timeout}s")
+
+    def stats(self, busiest=5):
+        with self._stats_lock:
+            lanes = [
+                {
+                    "lane": index,
+                    "queue_depth": lane.waiting,
+                    "acquired": lane.acquired,
+                    "timeouts": lane.timeouts,
+                    "rejected": lane.rejected,
+                    "total_wait_ms": lane.total_wait * 1000,
+                    "avg_wait_ms": lane.total_wait * 1000 / lane.acquired if lane.acquired else 0.0,
+                    "max_wait_ms": lane.max_wait * 1000,
+                }
+                for index, lane in enumerate(self._lanes)
+            ]
+        acquired = sum(lane["acquired"] for lane in lanes)
+        total_wait_ms = sum(lane["total_wait_ms"] for lane in lanes)
+        return {
+            "lanes": len(lanes),
+            "max_waiters": self.max_waiters,
+            "queue_depth": sum(lane["queue_depth"] for lane in lanes),
+            "max_queue_depth": max((lane["queue_depth"] for lane in lanes), default=0),
+            "acquired": acquired,
+            "timeouts": sum(lane["timeouts"] for lane in lanes),
+            "rejected": sum(lane["rejected"] for lane in lanes),
+            "avg_wait_ms": total_wait_ms / acquired if acquired else 0.0,
+            "max_wait_ms": max((lane["max_wait_ms"] for lane in lanes), default=0.0),
+            # Most waiters now, then most time spent waiting overall
+            "busiest": sorted(
+                lanes, key=lambda lane: (lane["queue_depth"], lane["total_wait_ms"]), reverse=True
+            )[:busiest],
+        }